@@ -0,0 +1,347 @@
+"""
+Local HTTP API around FormAutofiller for the frontend.
+
+Run with `python api_server.py` and open http://127.0.0.1:8000/docs for the
+OpenAPI schema. Profiles are validated and cached server-side; URL batches are
+queued onto worker threads (sync Playwright never runs on the event loop) and
+per-field progress is streamed back as server-sent events.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Literal, Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from browser_pool import ThreadPools
+from combobox_driver import ComboboxDriver
+from failures import failure_result, navigate
+from field_classifier import load_default_classifier
+from form_autofiller import FormAutofiller
+from log_config import configure_logging, log_context, new_run_id
+from memory_monitor import MemoryGovernor
+from resume_assets import ResumeManager
+from simple_form_extractor import extract_fields_from_page
+from user_profile import UserProfile
+
+# Load environment variables from .env file
+load_dotenv()
+configure_logging()
+logger = logging.getLogger(__name__)
+
+WORKER_COUNT = int(os.getenv("AGENT_WORKERS", "4"))
+MAX_ATTEMPTS = int(os.getenv("AGENT_MAX_ATTEMPTS", "2"))
+SCREENSHOT_DIR = os.path.join(os.path.dirname(__file__), "screenshots")
+FRONTEND_ORIGINS = os.getenv("FRONTEND_ORIGINS", "http://localhost:3000").split(",")
+
+FINAL_STATUSES = ("completed", "failed")
+
+# Cached profiles and job state, keyed by id
+PROFILES: Dict[str, UserProfile] = {}
+JOBS: Dict[str, "Job"] = {}
+
+# Resumes are read once and uploaded from memory by every worker
+RESUMES = ResumeManager()
+# Combobox option lists harvested by any worker are reused by all of them
+COMBOBOXES = ComboboxDriver(cache_path=os.getenv("COMBOBOX_CACHE"))
+# Optional trained field classifier (see field_classifier.py); read-only, so shared
+CLASSIFIER = load_default_classifier()
+# Browser restarts at memory/job-count limits and per-job memory reports
+MEMORY = MemoryGovernor.from_env()
+
+
+class ProfileCreated(BaseModel):
+    profile_id: str
+    profile: Dict[str, Any]
+
+
+class JobBatch(BaseModel):
+    profile_id: str
+    urls: List[str]
+    mode: Literal["extract", "fill", "submit"] = "fill"
+    incremental: bool = False
+    # Click through the "next step" pages of multi-step forms (never the submit)
+    follow_steps: bool = False
+    # A variant registered with POST /resumes; otherwise the variant whose
+    # keywords best match job_title and the URL, else the profile's resume
+    resume_variant: Optional[str] = None
+    job_title: str = ""
+
+
+class ResumeVariant(BaseModel):
+    variant: str
+    path: str
+    keywords: List[str] = []
+
+
+class ResumeRegistered(BaseModel):
+    variant: str
+    name: str
+    sha256: str
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    url: str
+    profile_id: str
+    mode: str
+    status: str
+    result: Optional[Dict[str, Any]] = None
+
+
+class BatchCreated(BaseModel):
+    jobs: List[JobStatus]
+
+
+class Job:
+    """A queued URL for one profile, with the events it has produced so far."""
+
+    def __init__(self, url, profile_id, mode, incremental, run_id=None, follow_steps=False,
+                 resume_variant=None, job_title=""):
+        self.id = uuid.uuid4().hex
+        self.run_id = run_id
+        self.url = url
+        self.profile_id = profile_id
+        self.mode = mode
+        self.incremental = incremental
+        self.follow_steps = follow_steps
+        self.resume_variant = resume_variant
+        self.job_title = job_title
+        self.status = "queued"
+        self.attempts = 0
+        self.result = None
+        self.events = []
+        self.subscribers = set()
+        self._seq = itertools.count()
+
+    def publish(self, event_type, data=None):
+        """Record an event and push it to every live stream. Event-loop thread only."""
+        event = {"seq": next(self._seq), "event": event_type, "data": data or {}}
+        self.events.append(event)
+        for queue in self.subscribers:
+            queue.put_nowait(event)
+
+    @property
+    def done(self):
+        return self.status in FINAL_STATUSES
+
+    def to_status(self):
+        return JobStatus(
+            job_id=self.id, url=self.url, profile_id=self.profile_id,
+            mode=self.mode, status=self.status, result=self.result
+        )
+
+
+def _snake_case(key):
+    """Accept the frontend's camelCase keys (e.g. yearsExperience)."""
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", key).lower()
+
+
+def _format_event(event):
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+# Each worker thread owns its own Playwright instance and warm context pool
+THREAD_POOLS = ThreadPools(size=1, headless=True)
+
+
+def run_job(job, profile, emit):
+    """Process one job on a worker thread. `emit` is thread-safe."""
+    with log_context(run_id=job.run_id, job_id=job.id):
+        return _run_job(job, profile, emit)
+
+
+def _run_job(job, profile, emit):
+    pool = THREAD_POOLS.get()
+    if job.mode == "extract":
+        with pool.lease() as context:
+            page = context.new_page()
+            navigate(page, job.url)
+            fields = extract_fields_from_page(page)
+        for field in fields:
+            emit("field", {key: field[key] for key in ("label", "name", "type", "field_type", "is_required")})
+        return {"fields": fields}
+
+    autofiller = FormAutofiller(
+        profile, browser_pool=pool, resume_manager=RESUMES,
+        combobox_driver=COMBOBOXES, field_classifier=CLASSIFIER,
+        snapshot_dir=os.getenv("SNAPSHOT_DIR")
+    )
+    on_field = lambda entry: emit("field", entry)
+    screenshot_path = os.path.join(SCREENSHOT_DIR, f"{job.id}.png")
+    try:
+        if job.mode == "submit":
+            return autofiller.submit_form(
+                job.url, on_field=on_field, screenshot_path=screenshot_path,
+                resume_variant=job.resume_variant, job_title=job.job_title
+            )
+        return autofiller.fill_form(
+            job.url, headless=True, incremental=job.incremental, follow_steps=job.follow_steps,
+            on_field=on_field, screenshot_path=screenshot_path,
+            resume_variant=job.resume_variant, job_title=job.job_title
+        )
+    finally:
+        autofiller.close_browser()
+        # Memory accounting must never replace the job's own result
+        try:
+            emit("memory", MEMORY.after_job(pool, job.id, job.url))
+        except Exception:
+            logger.exception("Memory check failed after job %s", job.id)
+
+
+async def worker(queue, executor):
+    """Take jobs off the queue and run them on the thread pool."""
+    loop = asyncio.get_running_loop()
+    while True:
+        job = await queue.get()
+        emit = lambda event_type, data=None, job=job: loop.call_soon_threadsafe(job.publish, event_type, data)
+        job.status = "running"
+        job.attempts += 1
+        job.publish("status", {"status": job.status, "attempt": job.attempts})
+        try:
+            result = await loop.run_in_executor(executor, run_job, job, PROFILES[job.profile_id], emit)
+        except Exception as e:
+            result = failure_result(e, "worker")
+        finally:
+            queue.task_done()
+        job.result = result
+        failure = result.get("failure")
+        if failure and failure["retryable"] and job.attempts < MAX_ATTEMPTS:
+            # Transient failures go to the back of the queue instead of holding a worker
+            job.status = "queued"
+            job.publish("status", {"status": job.status, "failure": failure})
+            queue.put_nowait(job)
+            continue
+        job.status = "failed" if "error" in result else "completed"
+        job.publish("status", {"status": job.status, "result": job.result})
+
+
+@asynccontextmanager
+async def lifespan(app):
+    os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+    executor = ThreadPoolExecutor(max_workers=WORKER_COUNT, thread_name_prefix="autofill")
+    app.state.queue = asyncio.Queue()
+    workers = [asyncio.create_task(worker(app.state.queue, executor)) for _ in range(WORKER_COUNT)]
+    yield
+    for task in workers:
+        task.cancel()
+    COMBOBOXES.save()
+    # Browsers are thread-bound, so every worker thread closes its own pool
+    THREAD_POOLS.close_all(executor, WORKER_COUNT)
+    executor.shutdown(wait=True)
+
+
+app = FastAPI(title="Auto Apply Job Agent", version="0.1.0", lifespan=lifespan)
+app.add_middleware(CORSMiddleware, allow_origins=FRONTEND_ORIGINS, allow_methods=["*"], allow_headers=["*"])
+
+
+@app.post("/profiles", response_model=ProfileCreated)
+async def create_profile(data: Dict[str, Any]):
+    """Validate and cache a profile; jobs refer to it by id."""
+    try:
+        profile = UserProfile.from_dict({_snake_case(key): value for key, value in data.items()})
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    profile_id = uuid.uuid4().hex
+    PROFILES[profile_id] = profile
+    return ProfileCreated(profile_id=profile_id, profile=profile.to_dict())
+
+
+@app.get("/profiles/{profile_id}", response_model=ProfileCreated)
+async def get_profile(profile_id: str):
+    if profile_id not in PROFILES:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return ProfileCreated(profile_id=profile_id, profile=PROFILES[profile_id].to_dict())
+
+
+@app.post("/resumes", response_model=ResumeRegistered)
+async def register_resume(data: ResumeVariant):
+    """Load a tailored resume variant that jobs can ask for, or that is picked by its keywords."""
+    try:
+        asset = RESUMES.register(data.path, data.variant, data.keywords)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return ResumeRegistered(variant=asset.variant, name=asset.name, sha256=asset.sha256)
+
+
+@app.post("/jobs", response_model=BatchCreated)
+async def create_jobs(batch: JobBatch):
+    """Queue one job per URL for a cached profile."""
+    if batch.profile_id not in PROFILES:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if batch.resume_variant and batch.resume_variant not in RESUMES.variants:
+        raise HTTPException(status_code=422, detail=f"Unknown resume variant: {batch.resume_variant}")
+    jobs = []
+    run_id = new_run_id()
+    for url in batch.urls:
+        job = Job(url, batch.profile_id, batch.mode, batch.incremental, run_id, batch.follow_steps,
+                  batch.resume_variant, batch.job_title)
+        JOBS[job.id] = job
+        job.publish("status", {"status": job.status})
+        app.state.queue.put_nowait(job)
+        jobs.append(job.to_status())
+    return BatchCreated(jobs=jobs)
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    if job_id not in JOBS:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JOBS[job_id].to_status()
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Stream a job's events (past ones first) as server-sent events until it finishes."""
+    if job_id not in JOBS:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job = JOBS[job_id]
+
+    async def stream():
+        queue = asyncio.Queue()
+        job.subscribers.add(queue)
+        try:
+            last_seq = -1
+            for event in list(job.events):
+                last_seq = event["seq"]
+                yield _format_event(event)
+            if job.done:
+                return
+            while True:
+                event = await queue.get()
+                if event["seq"] <= last_seq:
+                    continue
+                last_seq = event["seq"]
+                yield _format_event(event)
+                if event["event"] == "status" and event["data"]["status"] in FINAL_STATUSES:
+                    return
+        finally:
+            job.subscribers.discard(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+@app.get("/health")
+async def health():
+    return {
+        "workers": WORKER_COUNT,
+        "queued": app.state.queue.qsize(),
+        "profiles": len(PROFILES),
+        "jobs": len(JOBS),
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=int(os.getenv("AGENT_PORT", "8000")))
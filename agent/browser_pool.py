@@ -0,0 +1,317 @@
+"""
+Pool of pre-warmed browser contexts shared across job applications.
+"""
+
+from contextlib import contextmanager
+from playwright.sync_api import sync_playwright
+import threading
+import time
+
+
+class PooledContext:
+    """A browser context owned by the pool, with where it was created and its last JS heap."""
+
+    def __init__(self, context, origin, create_ms):
+        self.context = context
+        self.origin = origin
+        self.create_ms = create_ms
+        self.created_at = time.time()
+        self.js_heap_bytes = 0
+
+
+class BrowserPool:
+    """
+    Keeps one Chromium running and a set of warm browser contexts ready to use.
+
+    Each job gets a fresh context with its own cookies and storage. When the
+    job is released its context is closed and a new one is warmed up in its
+    place: a context is never handed to a second job, so nothing a posting
+    stored (localStorage, IndexedDB, service workers of the page, its iframes
+    or any origin it passed through) can leak into the next candidate's job.
+    Only the browser process itself is shared.
+
+    Pass cdp_url (e.g. "http://localhost:9222") to attach to an already-running
+    Chromium instead of launching one.
+
+    Like the rest of the sync Playwright API, a pool must only be used from the
+    thread that started it.
+    """
+
+    def __init__(self, size=2, headless=True, cdp_url=None):
+        """
+        Args:
+            size (int): Number of warm contexts to keep ready.
+            headless (bool): Whether to launch the browser in headless mode.
+            cdp_url (str): Attach to a running Chromium over CDP instead of launching.
+        """
+        self.size = size
+        self.headless = headless
+        self.cdp_url = cdp_url
+        self.playwright = None
+        self.browser = None
+        self.idle = []
+        self.in_use = {}
+        # Leases by where their context was created, see metrics()
+        self.leases = {"start": 0, "release": 0, "acquire": 0}
+        self.create_ms = 0.0
+        self.recycled = 0
+        self.restarts = 0
+        self.jobs_since_start = 0
+        self.last_js_heap_bytes = 0
+
+    def start(self):
+        """Start (or attach to) the browser and pre-warm the contexts."""
+        if not self.playwright:
+            self.playwright = sync_playwright().start()
+        if self.cdp_url:
+            self.browser = self.playwright.chromium.connect_over_cdp(self.cdp_url)
+        else:
+            self.browser = self.playwright.chromium.launch(headless=self.headless)
+        self.jobs_since_start = 0
+        self._refill("start")
+        return self
+
+    def restart(self):
+        """
+        Replace the browser and its contexts, returning all of their memory to
+        the OS. Call it between jobs: leased contexts die with the old browser.
+        """
+        for pooled in self.idle:
+            self._close_context(pooled)
+        self.idle = []
+        if self.browser:
+            try:
+                self.browser.close()
+            except Exception:
+                pass  # Already crashed
+            self.browser = None
+        self.restarts += 1
+        self.start()
+
+    def browser_pids(self):
+        """
+        Process ids of the browser (browser, renderer, GPU and utility processes).
+
+        Returns:
+            list: The pids, or an empty list if the browser cannot report them.
+        """
+        try:
+            session = self.browser.new_browser_cdp_session()
+            try:
+                info = session.send("SystemInfo.getProcessInfo")
+            finally:
+                session.detach()
+        except Exception:
+            return []
+        return [process["id"] for process in info.get("processInfo", [])]
+
+    def close(self):
+        """Close every context and the browser (or detach from it over CDP)."""
+        for pooled in self.idle + list(self.in_use.values()):
+            self._close_context(pooled)
+        self.idle = []
+        self.in_use = {}
+        if self.browser:
+            self.browser.close()
+            self.browser = None
+        if self.playwright:
+            self.playwright.stop()
+            self.playwright = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _new_context(self, origin):
+        started = time.perf_counter()
+        context = self.browser.new_context(viewport={"width": 1280, "height": 800})
+        context.set_default_timeout(30000)  # 30 seconds
+        create_ms = (time.perf_counter() - started) * 1000
+        self.create_ms += create_ms
+        return PooledContext(context, origin, create_ms)
+
+    def _close_context(self, pooled):
+        try:
+            pooled.context.close()
+        except Exception:
+            pass  # Already gone with the browser
+
+    def _refill(self, origin):
+        while len(self.idle) + len(self.in_use) < self.size:
+            self.idle.append(self._new_context(origin))
+
+    def _is_healthy(self, pooled):
+        try:
+            pooled.context.cookies()
+            return True
+        except Exception:
+            return False
+
+    def health_check(self):
+        """
+        Restart the browser if it died, drop broken idle contexts and refill.
+
+        Returns:
+            bool: Whether the browser was healthy before the check.
+        """
+        healthy = bool(self.browser) and self.browser.is_connected()
+        if not healthy:
+            # Contexts die with their browser; leased ones are dropped on release
+            self.idle = []
+            self.restarts += 1
+            self.start()
+        else:
+            self.idle = [pooled for pooled in self.idle if self._is_healthy(pooled)]
+            self._refill("start")
+        return healthy
+
+    def acquire(self):
+        """
+        Lease a browser context for one job.
+
+        Returns:
+            BrowserContext: An isolated context; hand it back with release().
+        """
+        if not self.browser or not self.browser.is_connected():
+            self.health_check()
+        while self.idle:
+            pooled = self.idle.pop()
+            if self._is_healthy(pooled):
+                break
+            self._close_context(pooled)
+        else:
+            pooled = self._new_context("acquire")
+        self.leases[pooled.origin] += 1
+        self.in_use[id(pooled.context)] = pooled
+        return pooled.context
+
+    def release(self, context):
+        """Close a leased context and warm up a fresh one in its place."""
+        pooled = self.in_use.pop(id(context), None)
+        if pooled is None:
+            return
+        self.jobs_since_start += 1
+        try:
+            self.last_js_heap_bytes = self._measure(pooled)
+        except Exception:
+            pass  # Crashed along with its pages
+        self._close_context(pooled)
+        self.recycled += 1
+        if self.browser and self.browser.is_connected():
+            self._refill("release")
+
+    @contextmanager
+    def lease(self):
+        """Context manager around acquire()/release()."""
+        context = self.acquire()
+        try:
+            yield context
+        finally:
+            self.release(context)
+
+    def _measure(self, pooled):
+        """Record (and return) the JS heap the context's pages use."""
+        total = 0
+        for page in pooled.context.pages:
+            session = pooled.context.new_cdp_session(page)
+            try:
+                session.send("Performance.enable")
+                metrics = session.send("Performance.getMetrics")["metrics"]
+                total += next((m["value"] for m in metrics if m["name"] == "JSHeapUsedSize"), 0)
+            finally:
+                session.detach()
+        pooled.js_heap_bytes = int(total)
+        return pooled.js_heap_bytes
+
+    def metrics(self):
+        """
+        Report pool usage.
+
+        Leased contexts are measured on the spot, so call it from the pool's thread.
+
+        A lease only counts as a hit when its context was warmed before any job
+        ran (at start, restart or health check). Contexts created when a job is
+        released are paid for synchronously between jobs and are counted as
+        "refilled" leases, so hit_rate is not inflated by the refill.
+
+        Returns:
+            dict: Leases by context origin, hit rate, time spent creating
+                contexts, recycling counts, the JS heap of the last released
+                job and the age and JS heap of every context.
+        """
+        for pooled in self.in_use.values():
+            try:
+                self._measure(pooled)
+            except Exception:
+                pass  # Crashed along with its pages; keep the last measurement
+        leases = sum(self.leases.values())
+        contexts = [(pooled, False) for pooled in self.idle] + [(pooled, True) for pooled in self.in_use.values()]
+        return {
+            "hits": self.leases["start"],
+            "refilled": self.leases["release"],
+            "misses": self.leases["acquire"],
+            "hit_rate": self.leases["start"] / leases if leases else 0.0,
+            "context_create_ms": round(self.create_ms, 1),
+            "recycled": self.recycled,
+            "restarts": self.restarts,
+            "jobs_since_start": self.jobs_since_start,
+            "last_js_heap_bytes": self.last_js_heap_bytes,
+            "idle": len(self.idle),
+            "in_use": len(self.in_use),
+            "contexts": [
+                {
+                    "age_seconds": round(time.time() - pooled.created_at, 1),
+                    "in_use": in_use,
+                    "origin": pooled.origin,
+                    "create_ms": round(pooled.create_ms, 1),
+                    "js_heap_bytes": pooled.js_heap_bytes,
+                }
+                for pooled, in_use in contexts
+            ],
+        }
+
+
+class ThreadPools:
+    """
+    One BrowserPool per worker thread of a thread pool executor.
+
+    Sync Playwright is thread-bound, so every worker thread lazily starts its
+    own pool, and at shutdown every thread has to close its own.
+    """
+
+    def __init__(self, **pool_options):
+        """
+        Args:
+            **pool_options: Passed to every BrowserPool (size, headless, cdp_url).
+        """
+        self.pool_options = pool_options
+        self._local = threading.local()
+
+    def get(self):
+        """The calling thread's pool, started on first use."""
+        if getattr(self._local, "pool", None) is None:
+            self._local.pool = BrowserPool(**self.pool_options).start()
+        return self._local.pool
+
+    def _close_own(self, barrier):
+        # Each call blocks until all of them have started, so no thread can take
+        # two of the calls and leave another thread's browser running
+        barrier.wait()
+        pool = getattr(self._local, "pool", None)
+        if pool is not None:
+            self._local.pool = None
+            pool.close()
+
+    def close_all(self, executor, workers):
+        """
+        Close the pool of every worker thread of `executor`.
+
+        Args:
+            executor (ThreadPoolExecutor): The executor the pools were used from.
+            workers (int): Its max_workers.
+        """
+        barrier = threading.Barrier(workers)
+        for future in [executor.submit(self._close_own, barrier) for _ in range(workers)]:
+            future.result()
@@ -0,0 +1,190 @@
+"""
+Driver for React-select and other custom combobox widgets.
+
+These render an <input> instead of a <select>, and their options only exist in
+the DOM while the menu is open, so get_select_options() cannot read them.
+"""
+
+import json
+import logging
+import os
+from urllib.parse import urlparse
+
+from playwright.sync_api import Error as PlaywrightError
+
+logger = logging.getLogger(__name__)
+
+# Option elements rendered by React-select (Greenhouse) and ARIA comboboxes
+OPTION_SELECTOR = "[role='option'], .select__option"
+OPTION_ATTRIBUTE = "data-autofill-option"
+
+# Collects every option of an open combobox menu in one in-page call and tags
+# them so the chosen one can be clicked directly.
+HARVEST_OPTIONS_JS = """
+(input) => {
+    const ATTRIBUTE = "%s";
+    const root = input.getRootNode();
+    root.querySelectorAll(`[${ATTRIBUTE}]`).forEach(node => node.removeAttribute(ATTRIBUTE));
+    const listboxId = input.getAttribute("aria-controls") || input.getAttribute("aria-owns");
+    const listbox = listboxId ? root.getElementById(listboxId) : null;
+    const nodes = Array.from((listbox || root).querySelectorAll("%s"));
+    return nodes.map((node, index) => {
+        node.setAttribute(ATTRIBUTE, String(index));
+        const text = node.innerText.trim();
+        return { text, value: node.getAttribute("data-value") || text };
+    });
+}
+""" % (OPTION_ATTRIBUTE, OPTION_SELECTOR)
+
+# Reads back the selection a combobox displays (React-select single value,
+# otherwise the input's own value); null when the widget shows neither.
+SELECTED_VALUE_JS = """
+(input) => {
+    const container = input.closest(".select__container, .select, [class*='-container']");
+    const single = container && container.querySelector(".select__single-value, [class*='singleValue']");
+    if (single) return single.innerText.trim();
+    return input.value ? input.value.trim() : null;
+}
+"""
+
+# Hosts of the ATS platforms whose forms share question templates
+ATS_HOSTS = {
+    "greenhouse.io": "greenhouse",
+    "lever.co": "lever",
+    "myworkdayjobs.com": "workday",
+    "ashbyhq.com": "ashby",
+    "icims.com": "icims",
+}
+
+
+def ats_template(url):
+    """Name of the ATS serving a URL (or its host), used to share cached options."""
+    host = urlparse(url).hostname or ""
+    for suffix, name in ATS_HOSTS.items():
+        if host == suffix or host.endswith("." + suffix):
+            return name
+    return host
+
+
+class ComboboxDriver:
+    """
+    Fills combobox fields: opens each widget once, harvests all of its options,
+    matches them with SelectFieldHandler and picks the match.
+
+    Option lists are cached per ATS template and question, so the same
+    question on a later form is answered by typing the known option and
+    clicking it in the filtered menu, without harvesting the whole menu
+    first. Every pick is read back from the widget; a cached list that does
+    not fit the form is dropped and the menu is harvested instead.
+    """
+
+    def __init__(self, cache_path=None):
+        """
+        Args:
+            cache_path (str): Optional JSON file to load the option cache from and save() it to.
+        """
+        self.cache_path = cache_path
+        self.option_cache = {}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path) as f:
+                self.option_cache = json.load(f)
+
+    def save(self):
+        """Persist the option cache to cache_path."""
+        if self.cache_path:
+            # A copy, so entries other threads add meanwhile can't break the dump
+            options = dict(self.option_cache)
+            with open(self.cache_path, "w") as f:
+                json.dump(options, f, indent=4)
+
+    @staticmethod
+    def is_combobox(field):
+        """Whether an extracted field is a custom combobox rather than a native select."""
+        return field.get("type") != "select-one" and (
+            "select__input" in (field.get("class") or "") or field.get("role") == "combobox"
+        )
+
+    @staticmethod
+    def cache_key(url, field):
+        question = (field.get("label") or field.get("name") or field.get("id") or "").strip().lower()
+        return f"{ats_template(url)}|{question}"
+
+    def harvest_options(self, frame, element, timeout=5000):
+        """Open the combobox and return all of its options, leaving the menu open."""
+        element.click()
+        frame.locator(OPTION_SELECTOR).first.wait_for(state="visible", timeout=timeout)
+        return element.evaluate(HARVEST_OPTIONS_JS)
+
+    @staticmethod
+    def selected_value(element):
+        """Text the widget shows as selected, or None if it cannot be read."""
+        return element.evaluate(SELECTED_VALUE_JS)
+
+    def _pick(self, frame, element, options, matched):
+        """Click the tagged option whose text is `matched` and confirm the widget shows it."""
+        index = next((i for i, option in enumerate(options) if option["text"] == matched), None)
+        if index is None:
+            element.press("Escape")
+            return False
+        frame.click(f"[{OPTION_ATTRIBUTE}='{index}']")
+        selected = self.selected_value(element)
+        # Widgets without a readable selection are trusted once the option was clicked
+        return selected is None or selected.lower() == matched.strip().lower()
+
+    def _fill_from_cache(self, frame, element, matched, timeout):
+        """Type a cached option to filter the menu and pick it, if the menu really offers it."""
+        element.click()
+        element.fill(matched)
+        try:
+            frame.locator(OPTION_SELECTOR).first.wait_for(state="visible", timeout=timeout)
+        except PlaywrightError:
+            element.fill("")
+            return False
+        # Only the filtered options are tagged, so the click can't land on another one
+        if self._pick(frame, element, element.evaluate(HARVEST_OPTIONS_JS), matched):
+            return True
+        element.fill("")
+        return False
+
+    def fill(self, frame, element, field, value, url, select_handler, timeout=5000):
+        """
+        Pick the option that best matches `value`.
+
+        Args:
+            frame (Frame): Frame the combobox lives in.
+            element (ElementHandle): The combobox input.
+            field (dict): The extracted field.
+            value (str): The value from the user profile.
+            url (str): URL of the form, used for the option cache.
+            select_handler (SelectFieldHandler): Matches the value to an option.
+            timeout (int): Milliseconds to wait for the menu to render.
+
+        Returns:
+            str: The selected option text, or None if nothing matched or the
+                widget does not show the match as selected.
+        """
+        select_type = select_handler.determine_field_type(
+            field.get("label") or "", field.get("name") or "", field.get("placeholder", "")
+        )
+        key = self.cache_key(url, field)
+        cached = self.option_cache.get(key)
+        if cached is not None:
+            matched = select_handler.match_select_option(cached, value, select_type)
+            if matched and self._fill_from_cache(frame, element, matched, timeout):
+                return matched
+            # Cached from another posting with a different list; harvest this one
+            logger.debug("Dropping stale combobox options for %s", key)
+            # Other threads share the cache and may have dropped it already
+            self.option_cache.pop(key, None)
+
+        options = self.harvest_options(frame, element, timeout)
+        if options:
+            self.option_cache[key] = options
+        matched = select_handler.match_select_option(options, value, select_type)
+        if not matched:
+            element.press("Escape")
+            return None
+        if not self._pick(frame, element, options, matched):
+            self.option_cache.pop(key, None)
+            return None
+        return matched
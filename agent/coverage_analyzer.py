@@ -0,0 +1,207 @@
+"""
+Dry-run analysis of how much of each job application form a profile can fill.
+
+Extracts and classifies every posting, resolves each field against the user
+profile and reports coverage and the expected LLM cost, without filling
+anything. Fields are classified and comboboxes matched against the cached
+option lists the same way a real fill does them. Usage:
+
+    python coverage_analyzer.py job_links.txt coverage.csv [--profile user_profile.json] [--combobox-cache options.json]
+
+Write to a .parquet file instead of .csv to get Parquet output (needs pyarrow).
+"""
+
+import argparse
+import csv
+import os
+import time
+
+from browser_pool import BrowserPool
+from combobox_driver import ComboboxDriver
+from failures import classify_exception, navigate
+from field_classifier import load_default_classifier
+from log_config import configure_logging, log_context, new_run_id
+from select_field_handler import LLM_MAX_TOKENS, SelectFieldHandler
+from simple_form_extractor import extract_fields_from_page
+from user_profile import UserProfile
+
+# USD per 1K tokens for the option-matching model (gpt-3.5-turbo)
+LLM_INPUT_PRICE = float(os.getenv("LLM_INPUT_PRICE_PER_1K", "0.0005"))
+LLM_OUTPUT_PRICE = float(os.getenv("LLM_OUTPUT_PRICE_PER_1K", "0.0015"))
+# Rough token estimate for English prompts
+CHARS_PER_TOKEN = 4
+
+REPORT_COLUMNS = [
+    "url", "status", "failure_kind", "extraction_ms",
+    "fields", "answerable", "coverage",
+    "required_fields", "required_answerable", "required_coverage",
+    "llm_fields", "llm_field_labels", "est_llm_tokens", "est_llm_cost_usd",
+    "unknown_option_fields", "unknown_option_labels",
+    "unanswered_required_labels",
+]
+
+
+def resolve_field(field, profile, select_handler, url="", combobox_driver=None):
+    """
+    Work out how a field would be filled, without touching the page.
+
+    Comboboxes have no options until their menu is opened, so their options
+    come from the combobox driver's cache; without a cached list the field is
+    reported as "unknown_options" (it may or may not need the LLM).
+
+    Returns:
+        tuple: (answerable, source, estimated LLM tokens). Source is "profile",
+            "pattern", "direct", "llm", "unknown_options" or "none".
+    """
+    value = profile.get_value_for_field(field)
+    if not value:
+        return False, "none", 0
+    options = field.get("options")
+    if ComboboxDriver.is_combobox(field):
+        cache = combobox_driver.option_cache if combobox_driver else {}
+        options = cache.get(ComboboxDriver.cache_key(url, field))
+        if not options:
+            return True, "unknown_options", 0
+    elif field.get("type") != "select-one" or not options:
+        return True, "profile", 0
+
+    select_type = select_handler.determine_field_type(
+        field.get("label") or "", field.get("name") or "", field.get("placeholder", "")
+    )
+    matched, source = select_handler.match_without_llm(options, value, select_type)
+    if source == "llm":
+        prompt = select_handler.build_llm_prompt(options, value)
+        return True, "llm", len(prompt) // CHARS_PER_TOKEN
+    return matched is not None, source, 0
+
+
+def analyze_fields(url, fields, profile, select_handler, combobox_driver=None):
+    """Summarize fill coverage and LLM usage for one posting's extracted fields."""
+    required = [field for field in fields if field.get("is_required")]
+    answerable = 0
+    required_answerable = 0
+    llm_labels = []
+    unknown_option_labels = []
+    unanswered_required = []
+    prompt_tokens = 0
+
+    for field in fields:
+        ok, source, tokens = resolve_field(field, profile, select_handler, url, combobox_driver)
+        label = field.get("label") or field.get("name") or field.get("id") or ""
+        answerable += ok
+        if field.get("is_required"):
+            required_answerable += ok
+            if not ok:
+                unanswered_required.append(label)
+        if source == "llm":
+            llm_labels.append(label)
+            prompt_tokens += tokens
+        elif source == "unknown_options":
+            unknown_option_labels.append(label)
+
+    completion_tokens = len(llm_labels) * LLM_MAX_TOKENS
+    cost = prompt_tokens / 1000 * LLM_INPUT_PRICE + completion_tokens / 1000 * LLM_OUTPUT_PRICE
+    return {
+        "url": url,
+        "status": "ok",
+        "fields": len(fields),
+        "answerable": answerable,
+        "coverage": round(answerable / len(fields), 3) if fields else 0.0,
+        "required_fields": len(required),
+        "required_answerable": required_answerable,
+        # A form without required fields is fully covered
+        "required_coverage": round(required_answerable / len(required), 3) if required else 1.0,
+        "llm_fields": len(llm_labels),
+        "llm_field_labels": "; ".join(llm_labels),
+        "est_llm_tokens": prompt_tokens + completion_tokens,
+        "est_llm_cost_usd": round(cost, 6),
+        # Not included in the LLM estimate: their option lists are not cached yet
+        "unknown_option_fields": len(unknown_option_labels),
+        "unknown_option_labels": "; ".join(unknown_option_labels),
+        "unanswered_required_labels": "; ".join(unanswered_required),
+    }
+
+
+def analyze_postings(urls, profile, pool_size=2, field_classifier=None, combobox_driver=None):
+    """
+    Extract and analyze every posting headlessly.
+
+    Args:
+        urls (list): Job application URLs.
+        profile (UserProfile): The profile to resolve fields against.
+        pool_size (int): Number of warm browser contexts.
+        field_classifier (FieldClassifier): Optional classifier tried before the rules.
+        combobox_driver (ComboboxDriver): Driver whose cached option lists are used for comboboxes.
+
+    Returns:
+        list: One report row (dict with REPORT_COLUMNS) per URL.
+    """
+    select_handler = SelectFieldHandler()
+    rows = []
+    with BrowserPool(size=pool_size, headless=True) as pool:
+        for url in urls:
+            started = time.perf_counter()
+            phase = "navigation"
+            try:
+                with pool.lease() as context:
+                    page = context.new_page()
+                    navigate(page, url)
+                    phase = "extraction"
+                    fields = extract_fields_from_page(page)
+                if field_classifier:
+                    field_classifier.annotate(fields)
+                row = analyze_fields(url, fields, profile, select_handler, combobox_driver)
+            except Exception as e:
+                row = {"url": url, "status": "error", "failure_kind": classify_exception(e, phase)["kind"]}
+            row["extraction_ms"] = round((time.perf_counter() - started) * 1000)
+            rows.append(row)
+    return rows
+
+
+def write_report(rows, output_path):
+    """Write report rows as CSV, or as Parquet when the path ends in .parquet."""
+    if output_path.endswith(".parquet"):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+        columns = {column: [row.get(column) for row in rows] for column in REPORT_COLUMNS}
+        pq.write_table(pa.table(columns), output_path)
+        return
+    with open(output_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def read_urls(path):
+    """Read one URL per line, skipping blanks and # comments."""
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dry-run fill coverage analysis for job postings.")
+    parser.add_argument("urls_file", help="File with one job application URL per line")
+    parser.add_argument("output", help="Report path (.csv or .parquet)")
+    parser.add_argument("--profile", default=os.path.join(os.path.dirname(__file__), "user_profile.json"))
+    parser.add_argument("--combobox-cache", default=os.getenv("COMBOBOX_CACHE"),
+                        help="Combobox option cache saved by the API server")
+    args = parser.parse_args()
+    configure_logging()
+
+    profile = UserProfile()
+    if not profile.load_from_file(args.profile):
+        return
+    with log_context(run_id=new_run_id()):
+        rows = analyze_postings(
+            read_urls(args.urls_file), profile, field_classifier=load_default_classifier(),
+            combobox_driver=ComboboxDriver(cache_path=args.combobox_cache)
+        )
+    write_report(rows, args.output)
+    print(f"Analyzed {len(rows)} postings, report saved as: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Failure classification, per-phase timeouts and retries for form automation.
+"""
+
+import random
+import time
+
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+# Failure kinds reported to callers in result["failure"]["kind"]
+TIMEOUT = "timeout"
+NETWORK = "network"
+NAVIGATION = "navigation"
+BROWSER_CLOSED = "browser_closed"
+ELEMENT_NOT_FOUND = "element_not_found"
+SUBMIT_BUTTON_NOT_FOUND = "submit_button_not_found"
+UNKNOWN = "unknown"
+
+# Timeout budgets in milliseconds. "navigation" is the total for loading a page,
+# retries included, and "form" caps the whole fill of one page; the others apply
+# to every single Playwright call made in that phase.
+PHASE_TIMEOUTS = {
+    "navigation": 20000,
+    "field": 5000,
+    "form": 90000,
+    "submit": 15000,
+}
+
+# Messages Playwright uses for errors that are worth retrying
+NETWORK_MARKERS = ("net::ERR_", "NS_ERROR_", "ECONNREFUSED", "ECONNRESET")
+BROWSER_CLOSED_MARKERS = ("Target closed", "has been closed", "Browser closed", "Connection closed")
+NAVIGATION_MARKERS = ("Navigation failed", "frame was detached", "interrupted by another navigation")
+
+
+class AutofillError(Exception):
+    """An error raised by the autofiller itself, already classified."""
+
+    def __init__(self, kind, phase, message):
+        super().__init__(message)
+        self.kind = kind
+        self.phase = phase
+
+
+def is_retryable(kind, phase):
+    """
+    Only transient navigation and network problems are worth another attempt.
+
+    Nothing that failed in the submit phase is retried: the submit button may
+    already have been clicked, and a retry could send a second application.
+    """
+    if phase == "submit":
+        return False
+    if kind == NETWORK:
+        return True
+    return phase == "navigation" and kind in (TIMEOUT, NAVIGATION)
+
+
+def classify_exception(exc, phase):
+    """
+    Classify an exception raised while processing a form.
+
+    Args:
+        exc (Exception): The exception.
+        phase (str): The phase it was raised in (navigation, extraction, fill, submit).
+
+    Returns:
+        dict: {"kind", "phase", "retryable", "message"}, safe to serialize.
+            Failures that already used up their retries are not retryable.
+    """
+    message = str(exc)
+    if isinstance(exc, AutofillError):
+        kind, phase = exc.kind, exc.phase
+    elif isinstance(exc, PlaywrightTimeoutError):
+        kind = TIMEOUT
+    elif isinstance(exc, PlaywrightError):
+        if any(marker in message for marker in NETWORK_MARKERS):
+            kind = NETWORK
+        elif any(marker in message for marker in BROWSER_CLOSED_MARKERS):
+            kind = BROWSER_CLOSED
+        elif any(marker in message for marker in NAVIGATION_MARKERS):
+            kind = NAVIGATION
+        else:
+            kind = UNKNOWN
+    else:
+        kind = UNKNOWN
+    return {
+        "kind": kind,
+        "phase": phase,
+        "retryable": is_retryable(kind, phase) and not getattr(exc, "retries_exhausted", False),
+        "message": message.splitlines()[0] if message else "",
+    }
+
+
+def failure_result(exc, phase):
+    """Build the {"error", "failure"} result returned by fill_form/submit_form."""
+    return {
+        "error": str(exc),
+        "failure": classify_exception(exc, phase),
+    }
+
+
+def retry_transient(action, phase, attempts=3, backoff=0.5):
+    """
+    Run an action, retrying with exponential backoff on transient failures only.
+
+    Args:
+        action (callable): The action to run.
+        phase (str): Phase name used to classify failures.
+        attempts (int): Maximum number of attempts.
+        backoff (float): Initial delay between attempts in seconds.
+
+    Returns:
+        The action's return value. The last exception is re-raised when the
+        failure is not transient or the attempts are used up; in the latter
+        case it is marked so callers don't retry it all over again.
+    """
+    for attempt in range(attempts):
+        try:
+            return action()
+        except Exception as e:
+            if not classify_exception(e, phase)["retryable"]:
+                raise
+            if attempt == attempts - 1:
+                e.retries_exhausted = True
+                raise
+            time.sleep(backoff * (2 ** attempt) * random.uniform(0.8, 1.2))
+
+
+def navigate(page, url, timeout=None):
+    """
+    Load a form page within one navigation budget.
+
+    Navigation is retried on transient failures until the DOM is ready, all
+    attempts sharing the budget. The page is then given what is left of the
+    budget to go network-idle; a page that never does (analytics beacons,
+    long polling) is used as loaded rather than reported as a failure.
+
+    Args:
+        page (Page): The page to navigate.
+        url (str): The form URL.
+        timeout (int): Total budget in ms; defaults to PHASE_TIMEOUTS["navigation"].
+    """
+    timeout = timeout or PHASE_TIMEOUTS["navigation"]
+    deadline = time.monotonic() + timeout / 1000
+
+    def remaining_ms():
+        return (deadline - time.monotonic()) * 1000
+
+    def goto():
+        if remaining_ms() < 1:
+            error = AutofillError(TIMEOUT, "navigation", f"Page not loaded within {timeout}ms")
+            error.retries_exhausted = True
+            raise error
+        page.goto(url, wait_until="domcontentloaded", timeout=remaining_ms())
+
+    retry_transient(goto, "navigation")
+    try:
+        page.wait_for_load_state("networkidle", timeout=max(remaining_ms(), 1))
+    except PlaywrightTimeoutError:
+        pass  # The DOM is there; a network that stays busy is not a navigation failure
@@ -0,0 +1,156 @@
+"""
+Fill one job application form for many candidates.
+
+The posting is extracted and classified once into a candidate-independent
+FillPlan (field -> profile answer), which is then applied to every profile
+concurrently, each in its own browser context. LLM option matches are cached
+in a shared SelectFieldHandler, so a question/value pair is only sent to the
+LLM once across all candidates. Usage:
+
+    python fan_out.py https://boards.greenhouse.io/acme/jobs/123 alice.json bob.json --workers 4
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from browser_pool import BrowserPool, ThreadPools
+from combobox_driver import ComboboxDriver
+from field_classifier import load_default_classifier
+from form_autofiller import FormAutofiller
+from log_config import configure_logging, log_context, new_run_id
+from resume_assets import ResumeManager
+from select_field_handler import SelectFieldHandler
+from simple_form_extractor import FIELD_KEY_ATTRIBUTE, extract_important_fields
+from user_profile import UserProfile
+
+
+class PlanStep:
+    """One field of a plan: where it is and which profile answer it takes."""
+
+    def __init__(self, field, resolved):
+        self.field = field
+        self.resolved = resolved
+
+
+class FillPlan:
+    """A classified form that can be filled for any candidate."""
+
+    def __init__(self, url, steps):
+        self.url = url
+        self.steps = steps
+        # Steps without an id/name selector rely on the extraction keys
+        self.needs_tagging = any(step.field.get("selector", "").startswith(f"[{FIELD_KEY_ATTRIBUTE}") for step in steps)
+
+    def value_for(self, step, profile):
+        """The candidate's value for a step, or None if the profile has no answer."""
+        return profile.value_for(step.resolved, step.field.get("options"))
+
+
+def _stable_selector(field):
+    """A selector that finds the field on a fresh load of the page, if there is one."""
+    if field.get("id"):
+        return f"[id={json.dumps(field['id'])}]"
+    if field.get("name") and field.get("type") not in ("radio", "checkbox"):
+        return f"[name={json.dumps(field['name'])}]"
+    return field["selector"]
+
+
+def build_fill_plan(url, browser_pool=None, field_classifier=None):
+    """
+    Extract and classify a posting once.
+
+    Args:
+        url (str): The job application URL.
+        browser_pool (BrowserPool): Optional pool to extract with instead of launching a browser.
+        field_classifier (FieldClassifier): Optional classifier tried before the rules.
+
+    Returns:
+        FillPlan: The plan, with only the fields some profile attribute can answer.
+    """
+    steps = []
+    fields = extract_important_fields(url, browser_pool)
+    if field_classifier:
+        field_classifier.annotate(fields)
+    for field in fields:
+        resolved = field.get("resolved") or UserProfile.resolve_field(field)
+        if resolved is None:
+            continue
+        steps.append(PlanStep(dict(field, selector=_stable_selector(field)), resolved))
+    return FillPlan(url, steps)
+
+
+def fan_out(plan, profiles, workers=4, on_field=None):
+    """
+    Apply a plan to many profiles concurrently.
+
+    Each worker thread owns its own Playwright instance and browser, and
+    every candidate gets a fresh, isolated context from it.
+
+    Args:
+        plan (FillPlan): Plan from build_fill_plan().
+        profiles (list): UserProfile objects to fill the form for.
+        workers (int): Number of concurrent browsers.
+        on_field (callable): Called with (profile index, filled field entry).
+
+    Returns:
+        list: fill_form()-style results, in the order of `profiles`.
+    """
+    select_handler = SelectFieldHandler()
+    resume_manager = ResumeManager()
+    combobox_driver = ComboboxDriver()
+    pools = ThreadPools(size=1, headless=True)
+    run_id = new_run_id()
+
+    def run(index, profile):
+        with log_context(run_id=run_id, job_id=f"candidate-{index}"):
+            return _run(index, profile)
+
+    def _run(index, profile):
+        autofiller = FormAutofiller(
+            profile, browser_pool=pools.get(), resume_manager=resume_manager,
+            combobox_driver=combobox_driver, select_handler=select_handler
+        )
+        try:
+            return autofiller.apply_plan(
+                plan,
+                on_field=(lambda entry: on_field(index, entry)) if on_field else None,
+                screenshot_path=f"form_filled_{index}.png"
+            )
+        finally:
+            autofiller.close_browser()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fan-out") as executor:
+        try:
+            return list(executor.map(run, range(len(profiles)), profiles))
+        finally:
+            # Browsers are thread-bound, so each thread closes its own
+            pools.close_all(executor, workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill one posting for many candidates.")
+    parser.add_argument("url", help="Job application URL")
+    parser.add_argument("profiles", nargs="+", help="Profile JSON files, one per candidate")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    configure_logging()
+
+    profiles = []
+    for path in args.profiles:
+        profile = UserProfile()
+        if not profile.load_from_file(path):
+            return
+        profiles.append(profile)
+    workers = min(args.workers, len(profiles))
+    with BrowserPool(size=1, headless=True) as pool:
+        plan = build_fill_plan(args.url, browser_pool=pool, field_classifier=load_default_classifier())
+    results = fan_out(plan, profiles, workers=workers)
+    for path, result in zip(args.profiles, results):
+        status = result.get("error") or f"{len(result.get('filled_fields', []))} fields filled"
+        print(f"{os.path.basename(path)}: {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Local field classifier trained on past fills.
+
+Predicts which profile answer a form field needs (the same resolutions as
+UserProfile.resolve_field, e.g. ("value", "email") or ("yes_no", "relocate"))
+from its label, name, placeholder and input type. Features are hashed word and
+character n-grams; the model is a linear softmax classifier in NumPy, so a
+whole form is classified in one vectorized call on the CPU. Predictions below
+the confidence threshold are left to the rule-based resolution.
+
+Training data is logged by FormAutofiller(training_log=...) as JSON lines:
+{"label", "name", "placeholder", "type", "resolved"}, labelled by the rules.
+Questions the rules can't answer (cover letters, "how did you hear about
+us") are logged as NO_ANSWER, so the model learns to abstain. Train with:
+
+    python field_classifier.py train fills.jsonl field_classifier.npz
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency; the rules are used without it
+    np = None
+
+logger = logging.getLogger(__name__)
+
+FEATURE_BITS = 14
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), "field_classifier.npz")
+DEFAULT_MIN_CONFIDENCE = 0.8
+# Class for fields no profile attribute answers; predicting it leaves the field to the rules
+NO_ANSWER = ("none", "")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def field_features(field, dim=1 << FEATURE_BITS):
+    """Hashed feature indices for one field (unique, unweighted)."""
+    label = (field.get("label") or "").lower()
+    name = (field.get("name") or "").lower()
+    placeholder = (field.get("placeholder") or "").lower()
+    words = _TOKEN_RE.findall(label)
+
+    tokens = [f"t:{field.get('type') or ''}"]
+    tokens += [f"l:{word}" for word in words]
+    tokens += [f"l2:{a}_{b}" for a, b in zip(words, words[1:])]
+    tokens += [f"n:{word}" for word in _TOKEN_RE.findall(name)]
+    tokens += [f"p:{word}" for word in _TOKEN_RE.findall(placeholder)]
+    padded = f" {' '.join(words)} "
+    tokens += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return sorted({zlib.crc32(token.encode()) % dim for token in tokens})
+
+
+def _batch(fields, dim):
+    """Flattened feature indices and the offset of each field's first feature."""
+    indices, offsets = [], []
+    for field in fields:
+        offsets.append(len(indices))
+        indices.extend(field_features(field, dim))
+    return np.asarray(indices, dtype=np.int64), np.asarray(offsets, dtype=np.int64)
+
+
+def _scores(weights, bias, indices, offsets, count):
+    """Linear scores for a batch: the sum of each field's feature weight rows."""
+    scores = np.tile(bias, (count, 1))
+    if len(indices):
+        # Fields without features produce empty reduceat segments; mask those
+        sums = np.add.reduceat(weights[indices], offsets.clip(max=len(indices) - 1), axis=0)
+        lengths = np.diff(np.append(offsets, len(indices)))
+        scores += np.where(lengths[:, None] > 0, sums, 0)
+    return scores
+
+
+def _softmax(scores):
+    scores = scores - scores.max(axis=1, keepdims=True)
+    exp = np.exp(scores)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class FieldClassifier:
+    """Hashed n-gram linear classifier from field attributes to profile resolutions."""
+
+    def __init__(self, weights, bias, classes, min_confidence=DEFAULT_MIN_CONFIDENCE):
+        if np is None:
+            raise RuntimeError("The field classifier requires numpy (pip install numpy)")
+        self.weights = weights
+        self.bias = bias
+        self.classes = [tuple(resolved) for resolved in classes]
+        self.dim = weights.shape[0]
+        self.min_confidence = min_confidence
+
+    @classmethod
+    def train(cls, fields, labels, epochs=50, learning_rate=0.5, l2=1e-5, bits=FEATURE_BITS):
+        """
+        Fit the model with full-batch gradient descent.
+
+        Args:
+            fields (list): Field dicts with label/name/placeholder/type.
+            labels (list): The resolution for each field, e.g. ("value", "email").
+            epochs (int): Gradient steps.
+            learning_rate (float): Step size.
+            l2 (float): Weight decay.
+            bits (int): log2 of the hashed feature space.
+
+        Returns:
+            FieldClassifier: The trained classifier.
+        """
+        if np is None:
+            raise RuntimeError("The field classifier requires numpy (pip install numpy)")
+        dim = 1 << bits
+        classes = sorted({tuple(label) for label in labels})
+        class_index = {label: i for i, label in enumerate(classes)}
+        targets = np.array([class_index[tuple(label)] for label in labels])
+        count = len(fields)
+
+        indices, offsets = _batch(fields, dim)
+        rows = np.repeat(np.arange(count), np.diff(np.append(offsets, len(indices))))
+        weights = np.zeros((dim, len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+
+        for _ in range(epochs):
+            probabilities = _softmax(_scores(weights, bias, indices, offsets, count))
+            probabilities[np.arange(count), targets] -= 1
+            gradient = probabilities / count
+            weight_gradient = np.zeros_like(weights)
+            np.add.at(weight_gradient, indices, gradient[rows])
+            weights -= learning_rate * (weight_gradient + l2 * weights)
+            bias -= learning_rate * gradient.sum(axis=0)
+
+        return cls(weights, bias, classes)
+
+    @classmethod
+    def load(cls, path, min_confidence=DEFAULT_MIN_CONFIDENCE):
+        if np is None:
+            raise RuntimeError("The field classifier requires numpy (pip install numpy)")
+        data = np.load(path)
+        classes = json.loads(str(data["classes"]))
+        return cls(data["weights"], data["bias"], classes, min_confidence)
+
+    def save(self, path):
+        np.savez_compressed(
+            path, weights=self.weights, bias=self.bias,
+            classes=np.array(json.dumps([list(c) for c in self.classes]))
+        )
+
+    def predict(self, fields):
+        """
+        Classify a whole form in one call.
+
+        Returns:
+            list: (resolution, confidence) per field.
+        """
+        if not fields:
+            return []
+        indices, offsets = _batch(fields, self.dim)
+        probabilities = _softmax(_scores(self.weights, self.bias, indices, offsets, len(fields)))
+        best = probabilities.argmax(axis=1)
+        return [(self.classes[i], float(probabilities[row, i])) for row, i in enumerate(best)]
+
+    def annotate(self, fields):
+        """
+        Set field["resolved"] on the fields classified with enough confidence
+        as some profile answer. The others (including NO_ANSWER predictions)
+        are left for UserProfile's rule-based resolution.
+
+        Returns:
+            list: The same fields.
+        """
+        for field, (resolved, confidence) in zip(fields, self.predict(fields)):
+            if confidence >= self.min_confidence and resolved != NO_ANSWER:
+                field["resolved"] = resolved
+        return fields
+
+
+def load_default_classifier(path=None):
+    """Load the classifier if numpy and a trained model are available, else None."""
+    path = path or os.getenv("FIELD_CLASSIFIER_MODEL", DEFAULT_MODEL_PATH)
+    if np is None or not os.path.exists(path):
+        return None
+    classifier = FieldClassifier.load(path)
+    logger.info("Loaded field classifier %s (%d classes)", path, len(classifier.classes))
+    return classifier
+
+
+def read_training_log(path):
+    """Read logged fills, keeping the last label seen for each distinct field."""
+    examples = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            key = (record.get("label"), record.get("name"), record.get("placeholder"), record.get("type"))
+            examples[key] = record
+    records = list(examples.values())
+    return records, [tuple(record["resolved"]) for record in records]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the field classifier from logged fills.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    train_parser = subparsers.add_parser("train")
+    train_parser.add_argument("log", help="JSON lines written by FormAutofiller(training_log=...)")
+    train_parser.add_argument("model", nargs="?", default=DEFAULT_MODEL_PATH)
+    train_parser.add_argument("--epochs", type=int, default=50)
+    args = parser.parse_args()
+
+    fields, labels = read_training_log(args.log)
+    classifier = FieldClassifier.train(fields, labels, epochs=args.epochs)
+    accuracy = sum(
+        resolved == label for (resolved, _), label in zip(classifier.predict(fields), labels)
+    ) / max(len(labels), 1)
+    classifier.save(args.model)
+    print(f"Trained on {len(labels)} fields ({len(classifier.classes)} classes), "
+          f"training accuracy {accuracy:.1%}, model saved as: {args.model}")
+
+
+if __name__ == "__main__":
+    main()
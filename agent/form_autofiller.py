@@ -3,46 +3,137 @@ Form autofiller for job applications using Playwright.
 """
 
 from playwright.sync_api import sync_playwright
-from simple_form_extractor import extract_important_fields
+from playwright.sync_api import Error as PlaywrightError
+from failures import (
+    PHASE_TIMEOUTS, SUBMIT_BUTTON_NOT_FOUND, TIMEOUT,
+    AutofillError, failure_result, navigate
+)
+from simple_form_extractor import FieldWatcher, find_frame
 from user_profile import UserProfile
 from select_field_handler import SelectFieldHandler
-import time
+from resume_assets import ResumeManager
+from combobox_driver import ComboboxDriver
+from page_snapshots import SnapshotRecorder
+from field_classifier import NO_ANSWER
+import json
+from collections import deque
+import logging
 import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Buttons that move a multi-step (e.g. Workday) application to its next page.
+NEXT_STEP_SELECTORS = [
+    "[data-automation-id='bottom-navigation-next-button']",
+    "button:has-text('Next')",
+    "button:has-text('Continue')",
+]
+
+# A "next step" button with one of these words sends the application instead
+FINAL_STEP_WORDS = ("submit", "apply", "send")
+
+# Review pages shown right before the final submit (Workday, generic)
+REVIEW_STEP_SELECTORS = [
+    "[data-automation-id='reviewJobApplicationPage']",
+    "h1:has-text('Review'), h2:has-text('Review'), h3:has-text('Review')",
+]
 
 class FormAutofiller:
-    def __init__(self, user_profile):
+    def __init__(self, user_profile, browser_pool=None, cdp_url=None, timeouts=None, resume_manager=None,
+                 combobox_driver=None, select_handler=None, field_classifier=None, training_log=None,
+                 snapshot_dir=None):
         """
         Initialize the form autofiller with a user profile.
         
         Args:
             user_profile (UserProfile): The user profile containing information to fill forms with.
+            browser_pool (BrowserPool): Lease warm contexts from this pool instead of launching a browser.
+            cdp_url (str): Attach to an already-running Chromium over CDP instead of launching one.
+            timeouts (dict): Per-phase timeout budgets in ms, overriding failures.PHASE_TIMEOUTS.
+            resume_manager (ResumeManager): Shared in-memory resumes and their tailored variants.
+            combobox_driver (ComboboxDriver): Shared driver (and option cache) for custom comboboxes.
+            select_handler (SelectFieldHandler): Shared handler, so LLM matches are cached across forms.
+            field_classifier (FieldClassifier): Classifies each batch of fields before the rules run.
+            training_log (str): Append every filled (or deliberately skipped) field,
+                labelled by the rule-based resolution, as classifier training
+                examples (JSON lines).
+            snapshot_dir (str): Record the network traffic and DOM of every form into this
+                directory, for offline replay (see page_snapshots.py).
         """
         self.user_profile = user_profile
+        self.browser_pool = browser_pool
+        self.cdp_url = cdp_url
         self.playwright = None
         self.browser = None
+        self.context = None
         self.page = None
-        self.select_handler = SelectFieldHandler()
+        self.select_handler = select_handler or SelectFieldHandler()
+        self.timeouts = {**PHASE_TIMEOUTS, **(timeouts or {})}
+        self.resume_manager = resume_manager or ResumeManager()
+        self.resume = None
+        self.combobox_driver = combobox_driver or ComboboxDriver()
+        self.field_classifier = field_classifier
+        self.training_log = training_log
+        self.snapshot_dir = snapshot_dir
+        # Element handles of the current field, disposed once it is filled
+        self._handles = []
+        # Time the last screenshot took (its settle delay included), so fill timings can leave it out
+        self.last_screenshot_ms = 0
         
     def start_browser(self, headless=False):
         """Start the browser if it's not already running."""
+        if self.page:
+            return
+        if self.browser_pool:
+            self.context = self.browser_pool.acquire()
+            self.page = self.context.new_page()
+            return
         if not self.browser:
             self.playwright = sync_playwright().start()
-            self.browser = self.playwright.chromium.launch(headless=headless)
-            self.page = self.browser.new_page()
-            self.page.set_default_timeout(30000)  # 30 seconds
+            if self.cdp_url:
+                self.browser = self.playwright.chromium.connect_over_cdp(self.cdp_url)
+                self.context = self.browser.contexts[0] if self.browser.contexts else self.browser.new_context()
+            else:
+                self.browser = self.playwright.chromium.launch(headless=headless)
+        # A page from browser.new_page() owns its context, so closing it frees both
+        self.page = self.context.new_page() if self.cdp_url else self.browser.new_page()
+        self.page.set_default_timeout(self.timeouts["field"])
+
+    def close_page(self):
+        """
+        Finish a job without closing the browser: dispose its element handles
+        and close its page (a pooled context goes back to the pool). The next
+        fill_form() opens a fresh page.
+        """
+        self._dispose_handles()
+        if self.browser_pool and self.context:
+            # The pool closes the context and warms up a fresh one for the next job
+            self.browser_pool.release(self.context)
+            self.context = None
+        elif self.page:
+            # With CDP only our own tab is closed; the attached browser keeps running
+            try:
+                self.page.close()
+            except PlaywrightError:
+                pass  # Already gone with the browser
+        self.page = None
             
     def close_browser(self):
         """Close the browser and cleanup resources."""
+        self.close_page()
         if self.browser:
             self.browser.close()
             self.browser = None
         if self.playwright:
             self.playwright.stop()
             self.playwright = None
+        self.context = None
         self.page = None
         
     def take_full_page_screenshot(self, path):
         """Take a screenshot of the entire page, not just the visible viewport."""
+        started = time.perf_counter()
         # Save the current viewport size
         original_viewport = self.page.viewport_size
         
@@ -56,8 +147,235 @@ class FormAutofiller:
         # Restore the original viewport size
         if original_viewport:
             self.page.set_viewport_size(original_viewport)
+        self.last_screenshot_ms = (time.perf_counter() - started) * 1000
         
-    def fill_form(self, url, headless=False, slow_mo=100):
+    def _locate(self, field, fallback_selector=None):
+        """Find the element for an extracted field in the frame it was found in."""
+        frame = find_frame(self.page, field)
+        if frame is None:
+            return None
+        selector = field.get("selector")
+        if not selector:
+            if field.get("id"):
+                selector = f"#{field['id']}"
+            elif field.get("name"):
+                selector = f"[name='{field['name']}']"
+        element = frame.query_selector(selector) if selector else None
+        if not element and fallback_selector:
+            element = frame.query_selector(fallback_selector)
+        if element:
+            self._handles.append(element)
+        return element
+
+    @staticmethod
+    def _dispose(handle):
+        try:
+            handle.dispose()
+        except PlaywrightError:
+            pass  # Its page navigated or closed, which released it already
+
+    def _dispose_handles(self):
+        """Release the element handles of the last field in the page as well as in Python."""
+        for handle in self._handles:
+            self._dispose(handle)
+        self._handles = []
+
+    def _fill_field(self, field, value=None):
+        """
+        Fill a single extracted field.
+
+        Args:
+            field (dict): A field returned by the extractor.
+            value (str): Value to fill; looked up in the user profile when None.
+
+        Returns:
+            dict: The filled field entry, or None if the field was skipped.
+        """
+        try:
+            return self._fill(field, value)
+        finally:
+            # Handles otherwise stay alive in the page until it is closed
+            self._dispose_handles()
+
+    def _fill(self, field, value):
+        field_id = field.get("id")
+        field_name = field.get("name")
+        field_type = field.get("type")
+        field_label = field.get("label")
+        display_name = field_label or field_name or field_id
+
+        # Get the value from the user profile
+        if value is None:
+            value = self.user_profile.get_value_for_field(field)
+
+        if not value:
+            return None
+
+        # Handle different field types
+        if field_type == "file" and field_id == "resume":
+            # Handle file uploads (resume), validated and loaded once per file
+            resume = self.resume or self.resume_manager.get(value)
+            if resume:
+                file_input = self._locate(field, fallback_selector="input[type='file']")
+                if file_input:
+                    file_input.set_input_files(resume.payload())
+                    return {
+                        "field": display_name,
+                        "value": f"File: {resume.name}",
+                        "status": "filled"
+                    }
+            return None
+
+        # Handle text inputs, textareas, and selects
+        element = self._locate(field)
+        if not element:
+            return None
+
+        # Custom comboboxes (React-select) only render their options when opened
+        if self.combobox_driver.is_combobox(field):
+            matched_value = self.combobox_driver.fill(
+                find_frame(self.page, field), element, field, value, self.page.url,
+                self.select_handler, timeout=self.timeouts["field"]
+            )
+            return {
+                "field": display_name,
+                "value": matched_value or value,
+                "status": "filled" if matched_value else "failed - no matching option"
+            }
+
+        # Check if it's a select element
+        if field_type == "select-one":
+            # Get all options
+            options = field.get("options") or self.select_handler.get_select_options(element)
+
+            # Determine field type for better matching
+            field_type = self.select_handler.determine_field_type(
+                field_label or "",
+                field_name or "",
+                field.get("placeholder", "")
+            )
+
+            # Get the best match
+            matched_value = self.select_handler.match_select_option(
+                options,
+                value,
+                field_type
+            )
+
+            if not matched_value:
+                return {
+                    "field": display_name,
+                    "value": value,
+                    "status": "failed - no matching option"
+                }
+            try:
+                # Try to select by label first
+                element.select_option(label=matched_value)
+                status = "filled"
+            except PlaywrightError:
+                # Fallback to value if label selection fails
+                element.select_option(value=matched_value)
+                status = "filled (by value)"
+            return {
+                "field": display_name,
+                "value": matched_value,
+                "status": status
+            }
+
+        # Fill text input or textarea
+        element.fill(value)
+        return {
+            "field": display_name,
+            "value": value,
+            "status": "filled"
+        }
+
+    def _classify(self, fields):
+        """Classify a batch of newly extracted fields in one call, if a classifier is set."""
+        if self.field_classifier and fields:
+            self.field_classifier.annotate(fields)
+        return fields
+
+    def _log_training_example(self, field, entry):
+        """
+        Append a field to the classifier training log, labelled by the rules.
+
+        Only fields that were filled are logged with their answer. Fields the
+        rules can't answer, and that were therefore skipped, are logged as
+        NO_ANSWER so the model learns to abstain. Failed fills are not logged,
+        and neither are fields only the classifier answered: its own
+        prediction is no label to train on.
+
+        Args:
+            field (dict): The processed field.
+            entry (dict): Its fill entry from _fill_field(), None if it was skipped.
+        """
+        resolved = UserProfile.resolve_field(field)
+        if resolved is None:
+            if entry is not None or field.get("resolved"):
+                return
+        elif entry is None or not entry["status"].startswith("filled"):
+            return
+        record = {key: field.get(key) for key in ("label", "name", "placeholder", "type")}
+        record["resolved"] = list(resolved or NO_ANSWER)
+        with open(self.training_log, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def _report_field(self, entry, filled_fields, on_field):
+        """Record a filled field and notify the progress callback."""
+        filled_fields.append(entry)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Filled field", extra={"data": entry})
+        if on_field:
+            on_field(entry)
+
+    def _failure(self, exc, phase, url):
+        """Log a failed form and build its classified result."""
+        result = failure_result(exc, phase)
+        logger.warning("Form failed", extra={"data": {"url": url, **result["failure"]}})
+        return result
+
+    def _advance_step(self):
+        """
+        Click the "next step" button of a multi-step form, if there is one.
+
+        Never submits: stops at a review page and skips buttons that would
+        send the application (Workday reuses the next-step button for Submit).
+        """
+        for selector in REVIEW_STEP_SELECTORS:
+            if self.page.query_selector(selector):
+                logger.info("Reached the review step, not advancing further")
+                return False
+        for selector in NEXT_STEP_SELECTORS:
+            button = self.page.query_selector(selector)
+            if not button:
+                continue
+            try:
+                text = (button.inner_text() or "").lower()
+                if any(word in text for word in FINAL_STEP_WORDS):
+                    continue
+                if button.is_visible() and button.is_enabled():
+                    button.click()
+                    self.page.wait_for_load_state("networkidle", timeout=self.timeouts["navigation"])
+                    return True
+            finally:
+                self._dispose(button)
+        return False
+
+    def _save_snapshot(self, recorder, url, result):
+        """Save a recorded form; a failed recording never fails the form."""
+        try:
+            recorder.save(self.snapshot_dir, url, result)
+        except (OSError, PlaywrightError) as e:
+            logger.warning("Could not save page snapshot for %s: %s", url, e)
+
+    def _navigate(self, url):
+        """Navigate to a form within the navigation budget, retrying transient failures."""
+        navigate(self.page, url, self.timeouts["navigation"])
+
+    def fill_form(self, url, headless=False, slow_mo=100, incremental=False, follow_steps=False, max_steps=10,
+                  on_field=None, screenshot_path="form_filled.png", resume_variant=None, job_title="",
+                  prepared=None):
         """
         Fill a job application form with user information.
         
@@ -65,127 +383,160 @@ class FormAutofiller:
             url (str): The URL of the job application form.
             headless (bool): Whether to run the browser in headless mode.
             slow_mo (int): Delay between actions in milliseconds.
+            incremental (bool): Watch the page for fields added after each action
+                (conditional questions, multi-step forms) and fill those too.
+            follow_steps (bool): When incremental, also click through "next step"
+                pages of multi-step forms (up to, never including, the submit).
+            max_steps (int): Maximum number of "next step" pages to follow.
+            on_field (callable): Called with each filled field entry as soon as it is filled.
+            screenshot_path (str): Where to save the full-page screenshot.
+            resume_variant (str): Name of a registered resume variant to upload.
+            job_title (str): Used with the URL to pick the best-fitting resume variant.
+            prepared (PreparedForm): The form already loaded, extracted and classified
+                in a context leased from this autofiller's pool (see prefetch.py);
+                navigation and the first extraction are skipped. Its snapshot
+                recorder, if it was loaded with one, is saved like our own.
             
         Returns:
-            dict: Information about the filled form fields.
+            dict: Information about the filled form fields, or "error" and a
+                classified "failure" (see failures.classify_exception).
         """
-        # First extract the important fields
-        important_fields = extract_important_fields(url)
-        
         filled_fields = []
+        phase = "navigation"
+        self.resume = self.resume_manager.for_job(
+            self.user_profile.resume_path, resume_variant, f"{job_title} {url}"
+        )
+        recorder = None
         
         try:
-            # Start browser if not already running
-            self.start_browser(headless)
-            
-            # Set a reasonable viewport size
-            self.page.set_viewport_size({"width": 1280, "height": 800})
-            
-            # Navigate to the form
-            self.page.goto(url, wait_until="networkidle")
-            
-            # Fill each important field
-            for field in important_fields:
-                field_id = field.get("id")
-                field_name = field.get("name")
-                field_type = field.get("type")
-                field_label = field.get("label")
+            if prepared:
+                # Loaded ahead of time; the context goes back to the pool with close_page()
+                self.context, self.page = prepared.context, prepared.page
+                recorder = prepared.recorder if self.snapshot_dir else None
+            else:
+                # Start browser if not already running
+                self.start_browser(headless)
+                if self.snapshot_dir:
+                    recorder = SnapshotRecorder(self.page)
                 
-                # Get the value from the user profile
-                value = self.user_profile.get_value_for_field(field)
+                # Set a reasonable viewport size
+                self.page.set_viewport_size({"width": 1280, "height": 800})
                 
-                if not value:
+                # Navigate to the form
+                self._navigate(url)
+            self.page.set_default_timeout(self.timeouts["field"])
+            deadline = time.monotonic() + self.timeouts["form"] / 1000
+
+            # Extract the important fields from the loaded page
+            phase = "extraction"
+            if prepared:
+                watcher, pending = prepared.watcher, deque(prepared.fields)
+            else:
+                watcher = FieldWatcher(self.page, watch=incremental)
+                pending = deque(self._classify(watcher.new_fields()))
+            if recorder:
+                recorder.capture_dom()
+            steps = 0
+
+            phase = "fill"
+            while True:
+                # Fill each important field
+                while pending:
+                    if time.monotonic() > deadline:
+                        raise AutofillError(TIMEOUT, phase, f"Form not filled within {self.timeouts['form']}ms")
+                    field = pending.popleft()
+                    entry = self._fill_field(field)
+                    if entry:
+                        self._report_field(entry, filled_fields, on_field)
+                    if self.training_log:
+                        self._log_training_example(field, entry)
+                    if incremental:
+                        # Only fields revealed by the last action are classified
+                        pending.extend(self._classify(watcher.new_fields()))
+
+                if not incremental:
+                    break
+                # Give late renders a moment before deciding the step is complete
+                self.page.wait_for_timeout(slow_mo)
+                pending.extend(self._classify(watcher.new_fields()))
+                if pending:
                     continue
-                
-                # Handle different field types
-                if field_type == "file" and field_id == "resume":
-                    # Handle file uploads (resume)
-                    if os.path.exists(value):
-                        file_input = self.page.query_selector(f"input[type='file']")
-                        if file_input:
-                            file_input.set_input_files(value)
-                            filled_fields.append({
-                                "field": field_label or field_name or field_id,
-                                "value": f"File: {os.path.basename(value)}",
-                                "status": "filled"
-                            })
-                else:
-                    # Handle text inputs, textareas, and selects
-                    selector = None
-                    if field_id:
-                        selector = f"#{field_id}"
-                    elif field_name:
-                        selector = f"[name='{field_name}']"
-                    
-                    if selector:
-                        element = self.page.query_selector(selector)
-                        if element:
-                            # Check if it's a select element
-                            if field_type == "select-one":
-                                # Get all options
-                                options = self.select_handler.get_select_options(element)
-                                
-                                # Determine field type for better matching
-                                field_type = self.select_handler.determine_field_type(
-                                    field_label or "",
-                                    field_name or "",
-                                    field.get("placeholder", "")
-                                )
-                                
-                                # Get the best match
-                                matched_value = self.select_handler.match_select_option(
-                                    options,
-                                    value,
-                                    field_type
-                                )
-                                
-                                if matched_value:
-                                    try:
-                                        # Try to select by label first
-                                        element.select_option(label=matched_value)
-                                        filled_fields.append({
-                                            "field": field_label or field_name or field_id,
-                                            "value": matched_value,
-                                            "status": "filled"
-                                        })
-                                    except:
-                                        # Fallback to value if label selection fails
-                                        element.select_option(value=matched_value)
-                                        filled_fields.append({
-                                            "field": field_label or field_name or field_id,
-                                            "value": matched_value,
-                                            "status": "filled (by value)"
-                                        })
-                                else:
-                                    filled_fields.append({
-                                        "field": field_label or field_name or field_id,
-                                        "value": value,
-                                        "status": "failed - no matching option"
-                                    })
-                            else:
-                                # Fill text input or textarea
-                                element.fill(value)
-                                filled_fields.append({
-                                    "field": field_label or field_name or field_id,
-                                    "value": value,
-                                    "status": "filled"
-                                })
+                if not follow_steps or steps >= max_steps or not self._advance_step():
+                    break
+                steps += 1
+                pending.extend(self._classify(watcher.new_fields()))
             
             # Take a screenshot for verification
-            screenshot_path = "form_filled.png"
             self.take_full_page_screenshot(screenshot_path)
+            logger.info("Filled form", extra={"data": {"url": url, "filled": len(filled_fields), "steps": steps}})
             
-            return {
+            result = {
                 "filled_fields": filled_fields,
                 "screenshot": screenshot_path
             }
             
         except Exception as e:
+            result = self._failure(e, phase, url)
+
+        if recorder:
+            self._save_snapshot(recorder, url, result)
+        return result
+                
+    def apply_plan(self, plan, headless=True, on_field=None, screenshot_path="form_filled.png"):
+        """
+        Fill a form from a FillPlan built once for many candidates (see fan_out.py).
+
+        Skips extraction and classification: every step already knows where
+        its element is and which profile answer it needs.
+
+        Args:
+            plan (FillPlan): The candidate-independent plan for the form.
+            headless (bool): Whether to run the browser in headless mode.
+            on_field (callable): Called with each filled field entry, see fill_form().
+            screenshot_path (str): Where to save the full-page screenshot.
+
+        Returns:
+            dict: Same shape as fill_form().
+        """
+        filled_fields = []
+        phase = "navigation"
+        self.resume = self.resume_manager.for_job(self.user_profile.resume_path, job_text=plan.url)
+
+        try:
+            self.start_browser(headless)
+            self.page.set_viewport_size({"width": 1280, "height": 800})
+            self._navigate(plan.url)
+            self.page.set_default_timeout(self.timeouts["field"])
+            deadline = time.monotonic() + self.timeouts["form"] / 1000
+
+            if plan.needs_tagging:
+                # Some steps are located by extraction key; tag this page the same way
+                phase = "extraction"
+                FieldWatcher(self.page, watch=False).new_fields()
+
+            phase = "fill"
+            for step in plan.steps:
+                if time.monotonic() > deadline:
+                    raise AutofillError(TIMEOUT, phase, f"Form not filled within {self.timeouts['form']}ms")
+                value = plan.value_for(step, self.user_profile)
+                if not value:
+                    continue
+                entry = self._fill_field(step.field, value)
+                if entry:
+                    self._report_field(entry, filled_fields, on_field)
+
+            self.take_full_page_screenshot(screenshot_path)
+            logger.info("Filled form from plan", extra={"data": {"url": plan.url, "filled": len(filled_fields)}})
             return {
-                "error": str(e)
+                "filled_fields": filled_fields,
+                "screenshot": screenshot_path
             }
-                
-    def submit_form(self, url, submit_button_selector=None, headless=False):
+
+        except Exception as e:
+            return self._failure(e, phase, plan.url)
+
+    def submit_form(self, url, submit_button_selector=None, headless=False, on_field=None,
+                    screenshot_path="form_submitted.png", resume_variant=None, job_title=""):
         """
         Fill and submit a job application form.
         
@@ -193,19 +544,29 @@ class FormAutofiller:
             url (str): The URL of the job application form.
             submit_button_selector (str): CSS selector for the submit button.
             headless (bool): Whether to run the browser in headless mode.
+            on_field (callable): Called with each filled field entry, see fill_form().
+            screenshot_path (str): Where to save the screenshot of the submitted
+                form; the filled form is saved next to it with a "-filled" suffix.
+            resume_variant (str): Name of a registered resume variant to upload.
+            job_title (str): Used with the URL to pick the best-fitting resume variant.
             
         Returns:
             dict: Information about the form submission.
         """
         # First fill the form
-        result = self.fill_form(url, headless=headless)
+        root, ext = os.path.splitext(screenshot_path)
+        result = self.fill_form(url, headless=headless, on_field=on_field,
+                                screenshot_path=f"{root}-filled{ext}",
+                                resume_variant=resume_variant, job_title=job_title)
         
         if "error" in result:
             return result
             
+        phase = "navigation"
         try:
             # Navigate to the form
-            self.page.goto(url, wait_until="networkidle")
+            self._navigate(url)
+            phase = "submit"
             
             # Fill the form again (since we're in a new browser session)
             for field in result["filled_fields"]:
@@ -216,6 +577,7 @@ class FormAutofiller:
                 element = self.page.query_selector(f"[name='{field_name}']")
                 if element:
                     element.fill(value)
+                    self._dispose(element)
             
             # Find and click the submit button
             if submit_button_selector:
@@ -233,10 +595,9 @@ class FormAutofiller:
                 submit_button.click()
                 
                 # Wait for navigation or form submission
-                self.page.wait_for_load_state("networkidle")
+                self.page.wait_for_load_state("networkidle", timeout=self.timeouts["submit"])
                 
                 # Take a screenshot of the result
-                screenshot_path = "form_submitted.png"
                 self.take_full_page_screenshot(screenshot_path)
                 
                 return {
@@ -244,11 +605,9 @@ class FormAutofiller:
                     "screenshot": screenshot_path
                 }
             else:
-                return {
-                    "error": "Submit button not found"
-                }
+                return failure_result(
+                    AutofillError(SUBMIT_BUTTON_NOT_FOUND, phase, "Submit button not found"), phase
+                )
                 
         except Exception as e:
-            return {
-                "error": str(e)
-            } 
\ No newline at end of file
+            return self._failure(e, phase, url) 
\ No newline at end of file
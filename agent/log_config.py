@@ -0,0 +1,148 @@
+"""
+Logging setup for the agent: structured JSON records tagged with run/job ids,
+per-module levels and a non-blocking queue handler.
+
+Modules only do `logger = logging.getLogger(__name__)`; entry points call
+configure_logging() once. Records are handed to a background thread for
+formatting and writing, so the hot path only pays for a level check (plus
+queueing when the level is enabled).
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+import time
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+run_id_var = contextvars.ContextVar("run_id", default=None)
+job_id_var = contextvars.ContextVar("job_id", default=None)
+
+_listener = None
+
+
+class ContextFilter(logging.Filter):
+    """Stamp records with the run and job id of the code that logged them."""
+
+    def filter(self, record):
+        record.run_id = run_id_var.get()
+        record.job_id = job_id_var.get()
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves the formatting to the listener thread.
+
+    The stock prepare() formats the record on the logging thread and drops
+    exc_info; this one only merges the message arguments (they may be mutable
+    objects that change after the call) and keeps the exception for the
+    listener's formatter.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line. Pass structured fields with extra={"data": {...}}."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "run_id": getattr(record, "run_id", None),
+            "job_id": getattr(record, "job_id", None),
+        }
+        if getattr(record, "data", None):
+            entry["data"] = record.data
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def parse_module_levels(spec):
+    """Parse "user_profile=DEBUG,select_field_handler=WARNING" into a dict."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level=None, module_levels=None, json_output=True, stream=None):
+    """
+    Configure root logging once for the process.
+
+    Args:
+        level (str): Root level; defaults to $AGENT_LOG_LEVEL or INFO.
+        module_levels (dict): Per-logger levels; defaults to $AGENT_LOG_LEVELS
+            ("user_profile=DEBUG,form_autofiller=INFO").
+        json_output (bool): JSON lines if True, plain text otherwise.
+        stream: Where to write; defaults to stderr.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    level = level or os.getenv("AGENT_LOG_LEVEL", "INFO")
+    if module_levels is None:
+        module_levels = parse_module_levels(os.getenv("AGENT_LOG_LEVELS", ""))
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    if json_output:
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    records = queue.SimpleQueue()
+    handler = DeferredQueueHandler(records)
+    # Filters on the queue handler run in the logging thread, where the context is set
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level.upper())
+    for name, module_level in module_levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flush queued records and stop the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def new_run_id():
+    return time.strftime("%Y%m%d-%H%M%S-") + os.urandom(3).hex()
+
+
+@contextmanager
+def log_context(run_id=None, job_id=None):
+    """Tag every record logged inside the block (in this thread/task) with the ids."""
+    tokens = []
+    if run_id is not None:
+        tokens.append((run_id_var, run_id_var.set(run_id)))
+    if job_id is not None:
+        tokens.append((job_id_var, job_id_var.set(job_id)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
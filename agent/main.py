@@ -7,6 +7,9 @@ from dotenv import load_dotenv
 from simple_form_extractor import extract_important_fields
 from user_profile import UserProfile
 from form_autofiller import FormAutofiller
+from coverage_analyzer import analyze_postings, read_urls, write_report
+from log_config import configure_logging, log_context, new_run_id
+from field_classifier import load_default_classifier
 
 # Load environment variables from .env file
 load_dotenv()
@@ -60,6 +63,7 @@ def create_sample_profile():
 
 def main():
     """Main function to run the job application autofiller."""
+    configure_logging(json_output=False)
     print("Job Application Autofiller")
     print("=========================")
     
@@ -75,8 +79,14 @@ def main():
         print("Error loading user profile. Please check the file format.")
         return
     
-    # Create the form autofiller
-    autofiller = FormAutofiller(user_profile)
+    # Create the form autofiller (set CHROME_CDP_URL to reuse a running Chromium)
+    autofiller = FormAutofiller(
+        user_profile,
+        cdp_url=os.getenv("CHROME_CDP_URL"),
+        field_classifier=load_default_classifier(),
+        training_log=os.getenv("FIELD_TRAINING_LOG"),
+        snapshot_dir=os.getenv("SNAPSHOT_DIR"),
+    )
     
     try:
         # Get the job application URL
@@ -87,8 +97,9 @@ def main():
         print("1. Extract form fields only")
         print("2. Fill form fields (without submitting)")
         print("3. Fill and submit form")
+        print("4. Analyze fill coverage for a list of URLs (dry run)")
         
-        choice = input("Enter your choice (1-3): ")
+        choice = input("Enter your choice (1-4): ")
         
         if choice == "1":
             # Extract form fields only
@@ -127,6 +138,21 @@ def main():
                 print("\nBrowser will remain open indefinitely. Press Enter when you want to close it...")
                 input()
                 autofiller.close_browser()
+        elif choice == "4":
+            # Headless dry run: extraction and profile resolution only
+            urls_file = input("File with one URL per line (leave empty for the URL above): ").strip()
+            urls = read_urls(urls_file) if urls_file else [url]
+            output_path = input("Report path (.csv or .parquet) [coverage.csv]: ").strip() or "coverage.csv"
+            rows = analyze_postings(urls, user_profile)
+            write_report(rows, output_path)
+            
+            print("\n--- Fill Coverage ---")
+            for row in rows:
+                if row["status"] != "ok":
+                    print(f"URL: {row['url']} | Error: {row['failure_kind']}")
+                    continue
+                print(f"URL: {row['url']} | Required: {row['required_answerable']}/{row['required_fields']} | LLM fields: {row['llm_fields']} | Est. LLM cost: ${row['est_llm_cost_usd']}")
+            print(f"\nReport saved as: {output_path}")
         else:
             print("Invalid choice. Please run the script again.")
     finally:
@@ -134,4 +160,5 @@ def main():
         autofiller.close_browser()
 
 if __name__ == "__main__":
-    main()
+    with log_context(run_id=new_run_id()):
+        main()
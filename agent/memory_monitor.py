@@ -0,0 +1,275 @@
+"""
+Memory accounting and limits for long-running autofill workers.
+
+A worker that fills forms for days has to give back everything a job
+allocated. MemoryGovernor.after_job() runs after every job: it measures the
+RSS of the Python process and of the worker's browser, writes a per-job
+memory report, restarts the browser once it passes its memory or job-count
+limit, and warns when Python memory keeps growing across jobs (a leak that
+recycling the browser cannot fix). Usage:
+
+    python memory_monitor.py job_links.txt --max-browser-mb 1500 --max-jobs-per-browser 200 --report memory.jsonl
+
+psutil is used when installed, /proc otherwise (Linux only).
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from playwright.sync_api import ElementHandle
+
+from browser_pool import BrowserPool
+from coverage_analyzer import read_urls
+from form_autofiller import FormAutofiller
+from log_config import configure_logging, log_context, new_run_id
+from user_profile import UserProfile
+
+try:
+    import psutil
+except ImportError:  # Optional dependency; /proc is read instead
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def process_rss(pid):
+    """Resident memory of a process in bytes, 0 if it is gone or unreadable."""
+    if psutil:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return 0
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def browser_rss(pool):
+    """
+    Resident memory of a pool's browser processes in bytes.
+
+    Shared pages are counted once per process, so this overestimates the real
+    footprint but tracks its growth.
+
+    Returns:
+        int: The RSS, or None if the browser cannot list its processes. Other
+            workers' browsers share this process tree, so there is no safe
+            fallback to count instead.
+    """
+    pids = pool.browser_pids() if pool.browser else []
+    if not pids:
+        return None
+    return sum(process_rss(pid) for pid in pids)
+
+
+def _mb(size):
+    return None if size is None else round(size / MB, 1)
+
+
+def live_element_handles():
+    """
+    Number of ElementHandle objects still referenced from Python.
+
+    This walks every object the GC tracks, so it is a debugging aid, not
+    something to run after every job of a busy worker.
+    """
+    return sum(isinstance(obj, ElementHandle) for obj in gc.get_objects())
+
+
+class MemoryGovernor:
+    """
+    Enforces memory limits after each job and reports memory per job.
+
+    One governor can be shared by several worker threads, each passing its own pool.
+    """
+
+    def __init__(self, max_browser_mb=None, max_python_mb=None, max_jobs_per_browser=None,
+                 leak_window=20, leak_threshold_mb=50, report_path=None, count_handles=False):
+        """
+        Args:
+            max_browser_mb (int): Restart the browser when its RSS exceeds this.
+            max_python_mb (int): Flag the worker for a restart when Python's RSS exceeds this.
+            max_jobs_per_browser (int): Restart the browser after this many jobs.
+            leak_window (int): Number of jobs to look back over for steady Python growth.
+            leak_threshold_mb (int): Growth over the window that is reported as a leak.
+            report_path (str): Append one JSON line per job to this file.
+            count_handles (bool): Collect garbage and count live ElementHandles
+                after every job. Slow, for tracking down handle leaks.
+        """
+        self.max_browser_mb = max_browser_mb
+        self.max_python_mb = max_python_mb
+        self.max_jobs_per_browser = max_jobs_per_browser
+        self.leak_threshold_mb = leak_threshold_mb
+        self.report_path = report_path
+        self.count_handles = count_handles
+        self.python_history = deque(maxlen=leak_window)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Limits from $AGENT_MAX_BROWSER_MB, $AGENT_MAX_PYTHON_MB, $AGENT_MAX_JOBS_PER_BROWSER
+        and $AGENT_MEMORY_REPORT; $AGENT_COUNT_HANDLES=1 turns on the handle census.
+        """
+        def limit(name):
+            value = os.getenv(name)
+            return int(value) if value else None
+        return cls(
+            max_browser_mb=limit("AGENT_MAX_BROWSER_MB"),
+            max_python_mb=limit("AGENT_MAX_PYTHON_MB"),
+            max_jobs_per_browser=limit("AGENT_MAX_JOBS_PER_BROWSER"),
+            report_path=os.getenv("AGENT_MEMORY_REPORT"),
+            count_handles=os.getenv("AGENT_COUNT_HANDLES") == "1",
+        )
+
+    def _restart_reasons(self, pool, browser_bytes):
+        reasons = []
+        if self.max_browser_mb and browser_bytes is not None and browser_bytes > self.max_browser_mb * MB:
+            reasons.append("browser_rss")
+        if self.max_jobs_per_browser and pool.jobs_since_start >= self.max_jobs_per_browser:
+            reasons.append("job_count")
+        return reasons
+
+    def _check_leak(self, python_bytes):
+        with self._lock:
+            self.python_history.append(python_bytes)
+            history = list(self.python_history)
+        if len(history) < self.python_history.maxlen:
+            return False
+        growth = history[-1] - min(history)
+        if growth > self.leak_threshold_mb * MB:
+            logger.warning("Python memory grew %.0f MB over the last %d jobs, possible leak",
+                           growth / MB, len(history))
+            with self._lock:
+                self.python_history.clear()
+            return True
+        return False
+
+    def after_job(self, pool, job_id=None, url=None):
+        """
+        Measure memory after a job and recycle the browser if it is over its limits.
+
+        Call it on the pool's thread, after the job's page was closed.
+
+        Args:
+            pool (BrowserPool): The pool the job ran on.
+            job_id (str): Id for the report.
+            url (str): URL of the job, for the report.
+
+        Returns:
+            dict: The memory report. "python_over_limit" means the worker
+                process itself should be restarted.
+        """
+        python_bytes = process_rss(os.getpid())
+        browser_bytes = browser_rss(pool)
+        if browser_bytes is None and self.max_browser_mb:
+            logger.warning("Could not list the browser's processes, skipping the browser memory limit")
+        pool_metrics = pool.metrics()
+        report = {
+            "ts": round(time.time(), 3),
+            "job_id": job_id,
+            "url": url,
+            "python_rss_mb": round(python_bytes / MB, 1),
+            "browser_rss_mb": _mb(browser_bytes),
+            "js_heap_mb": round(pool_metrics["last_js_heap_bytes"] / MB, 1),
+            "live_element_handles": None,
+            "jobs_since_browser_start": pool.jobs_since_start,
+            "recycled_contexts": pool_metrics["recycled"],
+            "browser_restarted": [],
+            "python_over_limit": bool(self.max_python_mb and python_bytes > self.max_python_mb * MB),
+            "possible_leak": self._check_leak(python_bytes),
+        }
+        if self.count_handles:
+            gc.collect()
+            report["live_element_handles"] = live_element_handles()
+
+        reasons = self._restart_reasons(pool, browser_bytes)
+        if reasons:
+            pool.restart()
+            report["browser_restarted"] = reasons
+            report["browser_rss_after_restart_mb"] = _mb(browser_rss(pool))
+            logger.info("Restarted browser", extra={"data": {"reasons": reasons, "browser_rss_mb": report["browser_rss_mb"]}})
+        if report["python_over_limit"]:
+            logger.warning("Python RSS %.0f MB is over the %d MB limit", python_bytes / MB, self.max_python_mb)
+
+        logger.debug("Job memory", extra={"data": report})
+        if self.report_path:
+            with self._lock, open(self.report_path, "a") as f:
+                f.write(json.dumps(report) + "\n")
+        return report
+
+
+def run_worker(urls, profile, governor, incremental=False, screenshot_dir="screenshots"):
+    """
+    Fill forms one after another on one warm browser, within the governor's limits.
+
+    Every job closes its page (disposing its element handles) before memory
+    is measured. Stops early when Python itself is over its limit, so a
+    supervisor can start a fresh process for the remaining URLs.
+
+    Returns:
+        list: (url, fill_form() result, memory report) per processed URL.
+    """
+    os.makedirs(screenshot_dir, exist_ok=True)
+    results = []
+    with BrowserPool(size=1, headless=True) as pool:
+        autofiller = FormAutofiller(profile, browser_pool=pool)
+        for index, url in enumerate(urls):
+            job_id = f"job-{index}"
+            with log_context(job_id=job_id):
+                try:
+                    result = autofiller.fill_form(
+                        url, headless=True, incremental=incremental,
+                        screenshot_path=os.path.join(screenshot_dir, f"{job_id}.png")
+                    )
+                finally:
+                    autofiller.close_page()
+                report = governor.after_job(pool, job_id, url)
+            results.append((url, result, report))
+            if report["python_over_limit"]:
+                logger.warning("Stopping after %d of %d jobs to restart the worker", index + 1, len(urls))
+                break
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill many forms in one memory-bounded worker.")
+    parser.add_argument("urls_file", help="File with one job application URL per line")
+    parser.add_argument("--profile", default=os.path.join(os.path.dirname(__file__), "user_profile.json"))
+    parser.add_argument("--max-browser-mb", type=int)
+    parser.add_argument("--max-python-mb", type=int)
+    parser.add_argument("--max-jobs-per-browser", type=int)
+    parser.add_argument("--report", help="Per-job memory report (JSON lines)")
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--count-handles", action="store_true",
+                        help="Count live ElementHandles after every job (slow)")
+    args = parser.parse_args()
+    configure_logging()
+
+    profile = UserProfile()
+    if not profile.load_from_file(args.profile):
+        return
+    urls = read_urls(args.urls_file)
+    governor = MemoryGovernor(args.max_browser_mb, args.max_python_mb, args.max_jobs_per_browser,
+                              report_path=args.report, count_handles=args.count_handles)
+    with log_context(run_id=new_run_id()):
+        results = run_worker(urls, profile, governor, args.incremental)
+    failed = sum("error" in result for _, result, _ in results)
+    print(f"Processed {len(results)} of {len(urls)} URLs ({failed} failed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Page snapshots: record the network traffic and DOM of a form, replay it offline.
+
+FormAutofiller(snapshot_dir=...) records every form it processes into its own
+directory:
+
+    network.har      every response the page loaded (HAR 1.2, bodies embedded)
+    dom.html         the main frame as extracted, before anything was filled
+    dom_filled.html  the main frame after filling
+    meta.json        URL, recording time and the fill result
+
+Snapshots contain candidate data: the posted form bodies and the filled DOM
+hold the profile's answers (name, email, phone, resume). Keep the snapshot
+directory private. Cookie and authorization headers are redacted.
+
+The replay harness serves network.har through Playwright request interception
+(page.route), so a run can be reproduced, profiled and benchmarked without the
+live posting. Requests that were not recorded are aborted, keeping replays
+offline. Without OPENAI_API_KEY the select matching stays offline as well.
+
+    python page_snapshots.py snapshots/boards.greenhouse.io-20240501-101500-3fa2 --runs 5
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+from playwright.sync_api import Error as PlaywrightError
+from browser_pool import BrowserPool
+from log_config import configure_logging
+from user_profile import UserProfile
+
+logger = logging.getLogger(__name__)
+
+HAR_FILE = "network.har"
+DOM_FILE = "dom.html"
+FILLED_DOM_FILE = "dom_filled.html"
+META_FILE = "meta.json"
+# Larger bodies (videos, big images) are recorded without content
+MAX_BODY_BYTES = 5 * 1024 * 1024
+# Credentials never written to a snapshot
+REDACTED_HEADERS = ("cookie", "set-cookie", "authorization", "proxy-authorization")
+# Recomputed by the browser for the decoded body that replay serves
+_DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+def _redact(headers):
+    """HAR headers with credential values replaced."""
+    return [
+        {"name": header["name"], "value": "[redacted]"}
+        if header["name"].lower() in REDACTED_HEADERS else header
+        for header in headers
+    ]
+
+
+def _har_entry(request, response, body):
+    """One HAR 1.2 entry for a finished request."""
+    timing = request.timing
+    wait = max(timing.get("responseStart", 0) - timing.get("requestStart", 0), 0)
+    receive = max(timing.get("responseEnd", 0) - timing.get("responseStart", 0), 0)
+    started = timing.get("startTime")
+    post_data = request.post_data
+    content = {"size": len(body) if body is not None else 0, "mimeType": response.headers.get("content-type", "")}
+    if body is not None:
+        content.update(text=base64.b64encode(body).decode("ascii"), encoding="base64")
+
+    entry = {
+        "startedDateTime": datetime.fromtimestamp(
+            started / 1000 if started and started > 0 else time.time(), timezone.utc
+        ).isoformat(),
+        "time": round(wait + receive, 3),
+        "_resourceType": request.resource_type,
+        "request": {
+            "method": request.method,
+            "url": request.url,
+            "httpVersion": "HTTP/1.1",
+            "headers": _redact(request.headers_array()),
+            "queryString": [],
+            "cookies": [],
+            "headersSize": -1,
+            "bodySize": len(post_data) if post_data else 0,
+        },
+        "response": {
+            "status": response.status,
+            "statusText": response.status_text,
+            "httpVersion": "HTTP/1.1",
+            "headers": _redact(response.headers_array()),
+            "cookies": [],
+            "content": content,
+            "redirectURL": response.headers.get("location", ""),
+            "headersSize": -1,
+            "bodySize": content["size"],
+        },
+        "cache": {},
+        "timings": {"send": 0, "wait": round(wait, 3), "receive": round(receive, 3)},
+    }
+    if post_data:
+        entry["request"]["postData"] = {
+            "mimeType": request.headers.get("content-type", ""),
+            "text": post_data,
+        }
+    return entry
+
+
+class SnapshotRecorder:
+    """Records the responses of a page while a form is processed."""
+
+    def __init__(self, page):
+        self.page = page
+        self.entries = []
+        self.dom = None
+        page.on("requestfinished", self._on_request_finished)
+
+    def _on_request_finished(self, request):
+        try:
+            response = request.response()
+            if response is None:
+                return
+            body = None
+            length = response.headers.get("content-length")
+            # Redirects have no body; oversized ones are not worth keeping
+            if not 300 <= response.status < 400 and not (length and int(length) > MAX_BODY_BYTES):
+                body = response.body()
+                if len(body) > MAX_BODY_BYTES:
+                    body = None
+            self.entries.append(_har_entry(request, response, body))
+        except (PlaywrightError, ValueError) as e:
+            # The page may have navigated away and freed the body
+            logger.debug("Not recorded: %s (%s)", request.url, e)
+
+    def capture_dom(self):
+        """Keep the DOM as extracted, before anything is filled."""
+        self.dom = self.page.content()
+
+    def save(self, snapshot_dir, url, result):
+        """
+        Write the snapshot to a new directory under `snapshot_dir`.
+
+        Args:
+            snapshot_dir (str): Directory collecting all snapshots.
+            url (str): The form URL.
+            result (dict): The fill_form() result (fields filled or failure).
+
+        Returns:
+            str: The directory of this snapshot.
+        """
+        self.page.remove_listener("requestfinished", self._on_request_finished)
+        host = urlparse(url).hostname or "page"
+        path = os.path.join(snapshot_dir, f"{host}-{time.strftime('%Y%m%d-%H%M%S')}-{os.urandom(2).hex()}")
+        os.makedirs(path)
+
+        har = {"log": {
+            "version": "1.2",
+            "creator": {"name": "auto-apply-job-agent", "version": "1.0"},
+            "pages": [],
+            "entries": self.entries,
+        }}
+        with open(os.path.join(path, HAR_FILE), "w") as f:
+            json.dump(har, f)
+        if self.dom is not None:
+            with open(os.path.join(path, DOM_FILE), "w") as f:
+                f.write(self.dom)
+        try:
+            filled_dom = self.page.content()
+        except PlaywrightError:
+            filled_dom = None
+        if filled_dom is not None:
+            with open(os.path.join(path, FILLED_DOM_FILE), "w") as f:
+                f.write(filled_dom)
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump({"url": url, "recorded_at": time.time(), "result": result}, f, indent=2, default=str)
+
+        logger.info("Saved page snapshot", extra={"data": {"url": url, "path": path, "requests": len(self.entries)}})
+        return path
+
+
+def load_snapshot(path):
+    """
+    Read a snapshot directory.
+
+    Returns:
+        dict: "url", "recorded_at" and "result" from meta.json, plus the HAR "entries".
+    """
+    with open(os.path.join(path, META_FILE)) as f:
+        snapshot = json.load(f)
+    with open(os.path.join(path, HAR_FILE)) as f:
+        snapshot["entries"] = json.load(f)["log"]["entries"]
+    return snapshot
+
+
+class ReplayRouter:
+    """
+    Serves recorded HAR entries to a page through page.route().
+
+    Responses are matched by method and URL. A request made several times
+    gets the recorded responses in order, the last one repeating.
+    """
+
+    def __init__(self, entries):
+        self.responses = defaultdict(list)
+        for entry in entries:
+            request = entry["request"]
+            self.responses[(request["method"], request["url"])].append(entry["response"])
+        self.served = defaultdict(int)
+        self.missing = []
+
+    def install(self, page):
+        page.route("**/*", self.handle)
+
+    def handle(self, route):
+        request = route.request
+        key = (request.method, request.url)
+        recorded = self.responses.get(key)
+        if not recorded:
+            self.missing.append(request.url)
+            route.abort("internetdisconnected")
+            return
+        response = recorded[min(self.served[key], len(recorded) - 1)]
+        self.served[key] += 1
+
+        content = response["content"]
+        body = content.get("text", "")
+        body = base64.b64decode(body) if content.get("encoding") == "base64" else body.encode()
+        headers = {
+            header["name"]: header["value"] for header in response["headers"]
+            if header["name"].lower() not in _DROPPED_HEADERS + REDACTED_HEADERS
+        }
+        route.fulfill(status=response["status"], headers=headers, body=body)
+
+
+def _filled_summary(result):
+    """Comparable (field, value, status) triples of a fill result."""
+    return sorted(
+        (entry["field"] or "", str(entry.get("value")), entry.get("status"))
+        for entry in result.get("filled_fields", [])
+    )
+
+
+def replay(path, profile, runs=1, headless=True, incremental=False):
+    """
+    Fill a recorded form offline, `runs` times, on one warm browser.
+
+    Args:
+        path (str): Snapshot directory written by SnapshotRecorder.
+        profile (UserProfile): Profile to fill with.
+        runs (int): Number of replays, for benchmarking.
+        headless (bool): Whether to run the browser in headless mode.
+        incremental (bool): Passed to fill_form().
+
+    Returns:
+        list: One dict per run with "elapsed_ms" (the fill, without the
+            screenshot and its fixed settle delay), "screenshot_ms", "result",
+            "missing" (URLs not in the recording) and "matches_recording" (same
+            fields, values and statuses as the recorded run).
+    """
+    # Imported here: form_autofiller imports this module for recording
+    from form_autofiller import FormAutofiller
+
+    snapshot = load_snapshot(path)
+    recorded = _filled_summary(snapshot["result"])
+    runs_info = []
+    with BrowserPool(size=1, headless=headless) as pool:
+        for run in range(runs):
+            autofiller = FormAutofiller(profile, browser_pool=pool)
+            router = ReplayRouter(snapshot["entries"])
+            try:
+                autofiller.start_browser(headless)
+                router.install(autofiller.page)
+                started = time.perf_counter()
+                result = autofiller.fill_form(
+                    snapshot["url"], headless=headless, slow_mo=0, incremental=incremental,
+                    screenshot_path=os.path.join(path, f"replay_{run}.png")
+                )
+                elapsed = (time.perf_counter() - started) * 1000
+                screenshot_ms = autofiller.last_screenshot_ms
+            finally:
+                autofiller.close_browser()
+            runs_info.append({
+                "elapsed_ms": round(elapsed - screenshot_ms),
+                "screenshot_ms": round(screenshot_ms),
+                "result": result,
+                "missing": router.missing,
+                "matches_recording": _filled_summary(result) == recorded,
+            })
+    return runs_info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded form offline.")
+    parser.add_argument("snapshot", help="Snapshot directory (see FormAutofiller(snapshot_dir=...))")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--profile", default=os.path.join(os.path.dirname(__file__), "user_profile.json"))
+    args = parser.parse_args()
+
+    configure_logging(json_output=False)
+
+    profile = UserProfile()
+    if not profile.load_from_file(args.profile):
+        return
+    runs = replay(args.snapshot, profile, args.runs, not args.headed, args.incremental)
+    for number, run in enumerate(runs, 1):
+        result = run["result"]
+        outcome = "error: " + result["error"] if "error" in result else f"{len(result['filled_fields'])} fields"
+        print(f"Run {number}: {run['elapsed_ms']} ms, {outcome}, "
+              f"{'matches' if run['matches_recording'] else 'differs from'} recording, "
+              f"{len(run['missing'])} unrecorded requests")
+    timings = sorted(run["elapsed_ms"] for run in runs)
+    print(f"Median {timings[len(timings) // 2]} ms over {len(timings)} runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Pipelined batch filling with speculative prefetch of the next postings.
+
+While one form is being filled, the next `lookahead` URLs are already loading
+in their own warm contexts of the same browser. As soon as one of them has
+loaded, its fields are extracted and classified, and the select/combobox
+options that need the LLM are matched on a background thread pool, which
+fills the shared SelectFieldHandler cache. When the worker gets to a form it
+only has to fill it: no navigation, no extraction, and the LLM answers are
+already cached. Usage:
+
+    python prefetch.py job_links.txt --lookahead 3
+"""
+
+import argparse
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from browser_pool import BrowserPool
+from combobox_driver import ComboboxDriver
+from coverage_analyzer import read_urls
+from failures import PHASE_TIMEOUTS
+from field_classifier import load_default_classifier
+from form_autofiller import FormAutofiller
+from log_config import configure_logging, log_context, new_run_id
+from page_snapshots import SnapshotRecorder
+from select_field_handler import SelectFieldHandler
+from simple_form_extractor import FieldWatcher
+from user_profile import UserProfile
+
+logger = logging.getLogger(__name__)
+
+
+class PreparedForm:
+    """A posting loading (or loaded and extracted) in a leased context, ready to fill."""
+
+    def __init__(self, url, context, page):
+        self.url = url
+        self.context = context
+        self.page = page
+        self.watcher = None
+        self.fields = None
+        self.error = None
+        self.warmups = []
+        self.recorder = None
+        self.started = time.perf_counter()
+
+    @property
+    def extracted(self):
+        return self.fields is not None or self.error is not None
+
+
+class PrefetchScheduler:
+    """
+    Fills a batch of postings with a lookahead window of preloaded forms.
+
+    Sync Playwright is thread-bound, so all browser work stays on the calling
+    thread: the overlap comes from the browser loading pages on its own while
+    Python fills the current form, and from LLM option matching running on
+    background threads.
+    """
+
+    def __init__(self, profile, lookahead=3, incremental=False, llm_workers=4,
+                 select_handler=None, combobox_driver=None, field_classifier=None, snapshot_dir=None):
+        """
+        Args:
+            profile (UserProfile): The profile to fill every form with.
+            lookahead (int): Number of upcoming postings to preload.
+            incremental (bool): Passed to fill_form().
+            llm_workers (int): Threads matching options with the LLM ahead of time.
+            select_handler (SelectFieldHandler): Handler whose LLM cache is warmed.
+            combobox_driver (ComboboxDriver): Its cached option lists are warmed too.
+            field_classifier (FieldClassifier): Optional classifier tried before the rules.
+            snapshot_dir (str): Record every form for offline replay (see page_snapshots.py).
+        """
+        self.profile = profile
+        self.lookahead = lookahead
+        self.incremental = incremental
+        self.llm_workers = llm_workers
+        self.select_handler = select_handler or SelectFieldHandler()
+        self.combobox_driver = combobox_driver or ComboboxDriver()
+        self.field_classifier = field_classifier
+        self.snapshot_dir = snapshot_dir
+
+    def _preload(self, pool, url):
+        """
+        Lease a context and start loading `url` without waiting for it.
+
+        Never raises: a failure (including leasing the context or opening the
+        page) is kept in the returned form's error, and the form is then
+        filled the regular way.
+        """
+        prepared = PreparedForm(url, None, None)
+        try:
+            prepared.context = pool.acquire()
+            prepared.page = prepared.context.new_page()
+            if self.snapshot_dir:
+                # Attached before navigating so the whole load is recorded
+                prepared.recorder = SnapshotRecorder(prepared.page)
+            # Returns once the response starts; the page keeps loading in the browser
+            prepared.page.goto(url, wait_until="commit", timeout=PHASE_TIMEOUTS["navigation"])
+        except Exception as e:
+            prepared.error = e
+        return prepared
+
+    @staticmethod
+    def _is_loaded(prepared):
+        try:
+            return prepared.page.evaluate("document.readyState") == "complete"
+        except Exception:
+            return False  # Still navigating
+
+    def _extract(self, prepared, llm, wait_for_idle=True):
+        """
+        Wait for a preloaded page, extract and classify its fields and start the LLM warm-up.
+
+        Args:
+            prepared (PreparedForm): The preloaded form.
+            llm (Executor): Runs the LLM option matching.
+            wait_for_idle (bool): Give the page the navigation budget to go
+                network-idle first. Like failures.navigate(), a page that never
+                does is used as loaded. Off for forms further ahead, which are
+                only extracted once their document is complete.
+        """
+        try:
+            prepared.page.wait_for_load_state("domcontentloaded", timeout=PHASE_TIMEOUTS["navigation"])
+            if wait_for_idle:
+                try:
+                    prepared.page.wait_for_load_state("networkidle", timeout=PHASE_TIMEOUTS["navigation"])
+                except PlaywrightTimeoutError:
+                    pass  # Analytics beacons, long polling: the DOM is there
+            prepared.watcher = FieldWatcher(prepared.page, watch=self.incremental)
+            prepared.fields = prepared.watcher.new_fields()
+        except Exception as e:
+            prepared.error = e
+            return
+        if self.field_classifier:
+            self.field_classifier.annotate(prepared.fields)
+        for field in prepared.fields:
+            options = field.get("options")
+            if self.combobox_driver.is_combobox(field):
+                options = self.combobox_driver.option_cache.get(self.combobox_driver.cache_key(prepared.url, field))
+            value = self.profile.get_value_for_field(field)
+            if not options or not value:
+                continue
+            select_type = self.select_handler.determine_field_type(
+                field.get("label") or "", field.get("name") or "", field.get("placeholder", "")
+            )
+            _, source = self.select_handler.match_without_llm(options, value, select_type)
+            if source == "llm":
+                prepared.warmups.append(
+                    llm.submit(self.select_handler.match_select_option, options, value, select_type)
+                )
+        logger.debug("Prefetched form", extra={"data": {
+            "url": prepared.url, "fields": len(prepared.fields), "llm_warmups": len(prepared.warmups),
+        }})
+
+    def run(self, urls, screenshot_dir="screenshots", on_result=None):
+        """
+        Fill every posting, preloading the next ones while each is filled.
+
+        Args:
+            urls (list): Job application URLs, filled in order.
+            screenshot_dir (str): Where the full-page screenshots go.
+            on_result (callable): Called with (url, result) after each form.
+
+        Returns:
+            list: (url, fill_form() result) per URL.
+        """
+        os.makedirs(screenshot_dir, exist_ok=True)
+        results = []
+        upcoming = deque(urls)
+        window = deque()
+        with BrowserPool(size=self.lookahead + 1, headless=True) as pool, \
+                ThreadPoolExecutor(max_workers=self.llm_workers, thread_name_prefix="llm-warmup") as llm:
+            autofiller = FormAutofiller(
+                self.profile, browser_pool=pool, select_handler=self.select_handler,
+                combobox_driver=self.combobox_driver, field_classifier=self.field_classifier,
+                snapshot_dir=self.snapshot_dir
+            )
+            for index in range(len(upcoming)):
+                while upcoming and len(window) < self.lookahead + 1:
+                    window.append(self._preload(pool, upcoming.popleft()))
+                current = window.popleft()
+                if not current.extracted:
+                    self._extract(current, llm)
+                # Start on the postings behind it that have finished loading meanwhile
+                for ahead in window:
+                    if not ahead.extracted and self._is_loaded(ahead):
+                        self._extract(ahead, llm, wait_for_idle=False)
+                wait(current.warmups)
+
+                with log_context(job_id=f"job-{index}"):
+                    screenshot_path = os.path.join(screenshot_dir, f"job-{index}.png")
+                    if current.error is None:
+                        prepared = current
+                    else:
+                        # Prefetch failed; fill it the regular way, with navigation retries
+                        logger.info("Prefetch failed for %s: %s", current.url, current.error)
+                        if current.context is not None:
+                            pool.release(current.context)
+                        prepared = None
+                    result = autofiller.fill_form(
+                        current.url, headless=True, incremental=self.incremental,
+                        screenshot_path=screenshot_path, prepared=prepared
+                    )
+                    autofiller.close_page()
+                    logger.info("Form done", extra={"data": {
+                        "url": current.url, "ms_since_preload": round((time.perf_counter() - current.started) * 1000),
+                    }})
+                results.append((current.url, result))
+                if on_result:
+                    on_result(current.url, result)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a batch of postings with speculative prefetch.")
+    parser.add_argument("urls_file", help="File with one job application URL per line")
+    parser.add_argument("--profile", default=os.path.join(os.path.dirname(__file__), "user_profile.json"))
+    parser.add_argument("--lookahead", type=int, default=3)
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--snapshot-dir", help="Record every form here for offline replay")
+    args = parser.parse_args()
+    configure_logging()
+
+    profile = UserProfile()
+    if not profile.load_from_file(args.profile):
+        return
+    scheduler = PrefetchScheduler(
+        profile, lookahead=args.lookahead, incremental=args.incremental,
+        field_classifier=load_default_classifier(), snapshot_dir=args.snapshot_dir
+    )
+    with log_context(run_id=new_run_id()):
+        results = scheduler.run(read_urls(args.urls_file))
+    failed = sum("error" in result for _, result in results)
+    print(f"Filled {len(results) - failed} of {len(results)} forms")
+
+
+if __name__ == "__main__":
+    main()
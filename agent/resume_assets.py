@@ -0,0 +1,155 @@
+"""
+Resume files validated, hashed and loaded once, shared across uploads.
+"""
+
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+
+ALLOWED_EXTENSIONS = (".pdf", ".doc", ".docx", ".txt", ".rtf")
+MAX_RESUME_BYTES = 10 * 1024 * 1024  # Most ATS reject anything larger
+
+logger = logging.getLogger(__name__)
+
+
+class ResumeAsset:
+    """A validated resume held in memory, ready to hand to set_input_files."""
+
+    def __init__(self, path, content, variant="default", keywords=()):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.content = content
+        self.sha256 = hashlib.sha256(content).hexdigest()
+        self.mime_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.variant = variant
+        self.keywords = tuple(keyword.lower() for keyword in keywords)
+
+    def payload(self):
+        """File payload for Playwright's set_input_files (no disk read)."""
+        return {"name": self.name, "mimeType": self.mime_type, "buffer": self.content}
+
+
+class ResumeManager:
+    """
+    Validates and loads resume files once and hands out in-memory payloads.
+
+    Besides the resume path from the user profile, tailored variants can be
+    registered with keywords; for_job() picks the variant whose keywords best
+    match the job (title, URL, ...). Files with identical content share one
+    buffer. Loaded files are keyed on their modification time and size, so a
+    resume that is replaced on disk is loaded again. Safe to share between threads.
+    """
+
+    def __init__(self):
+        self.variants = {}
+        self._by_path = {}
+        self._by_hash = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stamp(path):
+        """(mtime, size) of a file, to tell when a cached load is out of date."""
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            raise ValueError(f"Cannot read resume {path}: {e}")
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self, path, variant="default", keywords=()):
+        """Validate and read a resume file. Raises ValueError if it is unusable."""
+        _, extension = os.path.splitext(path)
+        if extension.lower() not in ALLOWED_EXTENSIONS:
+            raise ValueError(f"Unsupported resume type '{extension}': {path}")
+        try:
+            with open(path, "rb") as f:
+                content = f.read(MAX_RESUME_BYTES + 1)
+        except OSError as e:
+            raise ValueError(f"Cannot read resume {path}: {e}")
+        if not content:
+            raise ValueError(f"Resume is empty: {path}")
+        if len(content) > MAX_RESUME_BYTES:
+            raise ValueError(f"Resume is larger than {MAX_RESUME_BYTES} bytes: {path}")
+
+        asset = ResumeAsset(path, content, variant, keywords)
+        # Reuse the buffer of an identical file that is already loaded
+        existing = self._by_hash.get(asset.sha256)
+        if existing:
+            asset.content = existing.content
+        else:
+            self._by_hash[asset.sha256] = asset
+        return asset
+
+    def register(self, path, variant="default", keywords=()):
+        """
+        Load a resume variant.
+
+        Args:
+            path (str): Path to the resume file.
+            variant (str): Name of the variant, e.g. "backend" or "data".
+            keywords (iterable): Words in a job title/URL that make this variant a good fit.
+
+        Returns:
+            ResumeAsset: The loaded resume. Raises ValueError if the file is unusable.
+        """
+        path = os.path.realpath(path)
+        with self._lock:
+            stamp = self._stamp(path)
+            asset = self._load(path, variant, keywords)
+            self.variants[variant] = asset
+            self._by_path[path] = (stamp, asset)
+            return asset
+
+    def get(self, path):
+        """
+        Return the resume at `path`, validating and loading it on first use.
+
+        Returns:
+            ResumeAsset: The resume, or None if the file is unusable. A failed
+                load is remembered only until the file changes; a missing file
+                is checked again on every call.
+        """
+        key = os.path.realpath(path)
+        try:
+            stamp = self._stamp(key)
+        except ValueError as e:
+            logger.warning("Error loading resume: %s", e)
+            return None
+        cached = self._by_path.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        with self._lock:
+            cached = self._by_path.get(key)
+            if not cached or cached[0] != stamp:
+                try:
+                    asset = self._load(key)
+                except ValueError as e:
+                    logger.warning("Error loading resume: %s", e)
+                    asset = None
+                cached = self._by_path[key] = (stamp, asset)
+            return cached[1]
+
+    def for_job(self, default_path, variant=None, job_text=""):
+        """
+        Pick the resume to upload for a job.
+
+        Args:
+            default_path (str): Resume from the user profile, used when no variant fits.
+            variant (str): Explicitly requested variant name.
+            job_text (str): Job title, URL or description to match variant keywords against.
+
+        Returns:
+            ResumeAsset: The chosen resume, or None if none is usable.
+        """
+        if variant and variant in self.variants:
+            return self.variants[variant]
+        job_text = job_text.lower()
+        best, best_score = None, 0
+        for asset in self.variants.values():
+            score = sum(keyword in job_text for keyword in asset.keywords)
+            if score > best_score:
+                best, best_score = asset, score
+        if best:
+            return best
+        return self.get(default_path) if default_path else None
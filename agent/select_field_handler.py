@@ -2,7 +2,8 @@
 Handler for select/dropdown fields in job applications.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+import logging
 import openai
 import os
 from dotenv import load_dotenv
@@ -10,6 +11,11 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Completion budget for a single option-matching request
+LLM_MAX_TOKENS = 50
+
 # Common patterns for different field types
 SELECT_PATTERNS = {
     "years_experience": {
@@ -44,6 +50,8 @@ class SelectFieldHandler:
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         if self.openai_api_key:
             openai.api_key = self.openai_api_key
+        # LLM answers keyed by (option texts, user value), shared by every form using this handler
+        self._llm_cache = {}
 
     def get_select_options(self, element) -> List[Dict[str, str]]:
         """Get all options from a select element."""
@@ -67,6 +75,35 @@ class SelectFieldHandler:
             Matched option text or None if no match found
         """
         # Try pattern matching first
+        matched = self._match_by_pattern(options, user_value, field_type)
+        if matched:
+            return matched
+
+        # If no pattern match and OpenAI is available, use LLM
+        if self.openai_api_key:
+            return self._use_llm_for_matching(options, user_value)
+        
+        # If no LLM available, try direct matching
+        return self._match_directly(options, user_value)
+
+    def match_without_llm(self, options: List[Dict[str, str]], user_value: str, field_type: str) -> Tuple[Optional[str], str]:
+        """
+        Match like match_select_option, but never call the LLM.
+
+        Returns:
+            (matched option text, source) where source is "pattern", "direct",
+            "llm" (the LLM would be asked; text is None) or "none".
+        """
+        matched = self._match_by_pattern(options, user_value, field_type)
+        if matched:
+            return matched, "pattern"
+        if self.openai_api_key:
+            return None, "llm"
+        matched = self._match_directly(options, user_value)
+        return matched, "direct" if matched else "none"
+
+    def _match_by_pattern(self, options: List[Dict[str, str]], user_value: str, field_type: str) -> Optional[str]:
+        """Match using the known SELECT_PATTERNS variations for the field type."""
         if field_type in SELECT_PATTERNS:
             for key, variations in SELECT_PATTERNS[field_type].items():
                 if any(variation in user_value.lower() for variation in variations):
@@ -74,22 +111,18 @@ class SelectFieldHandler:
                     for option in options:
                         if key in option['text'].lower():
                             return option['text']
+        return None
 
-        # If no pattern match and OpenAI is available, use LLM
-        if self.openai_api_key:
-            return self._use_llm_for_matching(options, user_value)
-        
-        # If no LLM available, try direct matching
+    def _match_directly(self, options: List[Dict[str, str]], user_value: str) -> Optional[str]:
+        """Return the first option whose text contains the user's value."""
         for option in options:
             if user_value.lower() in option['text'].lower():
                 return option['text']
-        
         return None
 
-    def _use_llm_for_matching(self, options: List[Dict[str, str]], user_value: str) -> Optional[str]:
-        """Use OpenAI to find the best matching option."""
-        try:
-            prompt = f"""
+    def build_llm_prompt(self, options: List[Dict[str, str]], user_value: str) -> str:
+        """The prompt sent to the LLM to pick an option."""
+        return f"""
             Given these dropdown options:
             {[opt['text'] for opt in options]}
             
@@ -100,27 +133,45 @@ class SelectFieldHandler:
             If no good match exists, return 'NO_MATCH'.
             """
 
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that matches user input to dropdown options."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=50
-            )
-
-            matched_text = response.choices[0].message.content.strip()
-            
-            # Verify the matched text exists in options
-            if matched_text != 'NO_MATCH' and any(opt['text'] == matched_text for opt in options):
-                return matched_text
-            
-            return None
-
+    def _use_llm_for_matching(self, options: List[Dict[str, str]], user_value: str) -> Optional[str]:
+        """Use OpenAI to find the best matching option."""
+        cache_key = (tuple(opt['text'] for opt in options), user_value)
+        if cache_key in self._llm_cache:
+            return self._llm_cache[cache_key]
+        try:
+            matched = self._ask_llm(options, user_value)
         except Exception as e:
-            print(f"Error using LLM for matching: {str(e)}")
+            # Not cached, so a transient API error is retried on the next form
+            logger.warning("Error using LLM for matching: %s", e)
             return None
+        self._llm_cache[cache_key] = matched
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("LLM option match", extra={"data": {
+                "value": user_value, "options": len(options), "matched": matched,
+            }})
+        return matched
+
+    def _ask_llm(self, options: List[Dict[str, str]], user_value: str) -> Optional[str]:
+        """Send the matching prompt to OpenAI and validate the answer."""
+        prompt = self.build_llm_prompt(options, user_value)
+
+        response = openai.ChatCompletion.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that matches user input to dropdown options."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=LLM_MAX_TOKENS
+        )
+
+        matched_text = response.choices[0].message.content.strip()
+        
+        # Verify the matched text exists in options
+        if matched_text != 'NO_MATCH' and any(opt['text'] == matched_text for opt in options):
+            return matched_text
+        
+        return None
 
     def determine_field_type(self, label: str, name: str, placeholder: str) -> str:
         """Determine the type of select field based on its attributes."""
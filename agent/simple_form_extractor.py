@@ -1,4 +1,5 @@
 from playwright.sync_api import sync_playwright
+from failures import navigate
 
 IMPORTANT_KEYWORDS = [
     # Personal Information
@@ -37,64 +38,239 @@ IMPORTANT_KEYWORDS = [
 
 ]
 
-def extract_important_fields(url):
-    important_fields = []
+# Words that mark a work authorization / sponsorship question
+WORK_AUTHORIZATION_WORDS = ["authorized", "authorization", "work permit", "visa", "sponsorship"]
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)  # See browser action during testing
-        page = browser.new_page()
-        page.goto(url, timeout=60000)  # 60 sec timeout
-
-        # Grab all input, textarea, and select fields
-        form_elements = page.query_selector_all("input, textarea, select")
-
-        for element in form_elements:
-            tag = element.evaluate("e => e.tagName").lower()
-            element_type = element.get_attribute("type") or tag
-            id_attr = element.get_attribute("id")
-            name_attr = element.get_attribute("name")
-            placeholder = element.get_attribute("placeholder") or ""
-            class_attr = element.get_attribute("class") or ""
-            # Try to find label (either linked by "for" attribute or closest label)
-            label = ""
-            try:
-                if id_attr:
-                    label_element = page.query_selector(f"label[for='{id_attr}']")
-                    if label_element:
-                        label = label_element.inner_text().strip()
-                if not label:
-                    parent_label = element.evaluate_handle("el => el.closest('label')")
-                    if parent_label:
-                        label = parent_label.evaluate("e => e.innerText").strip()
-            except Exception:
-                pass
+# Attribute used to tag every form control we have already described, so that
+# later scans only pick up fields that were added since.
+FIELD_KEY_ATTRIBUTE = "data-autofill-key"
+
+# Collects descriptors for form controls in one in-page call per frame, including
+# controls inside open shadow roots. On the first call for a document it scans
+# every control; afterwards (when watching) it only returns controls a
+# MutationObserver saw being added since the previous call. Keys start with the
+# frame's prefix, so they are unique across all frames of the page.
+COLLECT_FIELDS_JS = """
+({ watch, prefix }) => {
+    const SELECTOR = "input, textarea, select";
+    const KEY_ATTRIBUTE = "%s";
+    const state = window.__autofillFields || (window.__autofillFields = {
+        prefix, nextKey: 0, pending: [], scanned: false, observer: null
+    });
+
+    // Collect controls below a root, descending into every open shadow root
+    const collect = (root, found) => {
+        found.push(...root.querySelectorAll(SELECTOR));
+        const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            if (node.shadowRoot) {
+                if (watch) observe(node.shadowRoot);
+                collect(node.shadowRoot, found);
+            }
+        }
+        return found;
+    };
+
+    // Shadow roots do not report mutations to observers of the light DOM,
+    // so each one gets observed separately.
+    const observe = root => {
+        if (state.observed.has(root)) return;
+        state.observed.add(root);
+        state.observer.observe(root, { childList: true, subtree: true });
+    };
+
+    if (watch && !state.observer) {
+        state.observer = new MutationObserver(records => {
+            for (const record of records) {
+                for (const node of record.addedNodes) {
+                    if (node.nodeType !== Node.ELEMENT_NODE) continue;
+                    if (node.matches(SELECTOR)) state.pending.push(node);
+                    if (node.shadowRoot) observe(node.shadowRoot);
+                    collect(node, state.pending);
+                }
+            }
+        });
+        state.observed = new WeakSet();
+        observe(document.documentElement);
+    }
+
+    const candidates = state.scanned
+        ? state.pending.splice(0)
+        : collect(document, []);
+    state.scanned = true;
+    state.pending.length = 0;
+
+    const findLabel = el => {
+        if (el.id) {
+            const byFor = el.getRootNode().querySelector(`label[for="${CSS.escape(el.id)}"]`);
+            if (byFor) return byFor.innerText.trim();
+        }
+        const parent = el.closest("label");
+        return parent ? parent.innerText.trim() : "";
+    };
+
+    const fields = [];
+    for (const el of candidates) {
+        if (!el.isConnected || el.hasAttribute(KEY_ATTRIBUTE)) continue;
+        const key = state.prefix + String(state.nextKey++);
+        el.setAttribute(KEY_ATTRIBUTE, key);
+        const tag = el.tagName.toLowerCase();
+        fields.push({
+            key,
+            tag,
+            type: tag === "select" ? el.type : (el.getAttribute("type") || tag),
+            id: el.getAttribute("id"),
+            name: el.getAttribute("name"),
+            placeholder: el.getAttribute("placeholder") || "",
+            class: el.getAttribute("class") || "",
+            role: el.getAttribute("role") || "",
+            label: findLabel(el),
+            value: tag === "select" ? el.value : (el.getAttribute("value") || ""),
+            required: el.hasAttribute("required"),
+            options: tag === "select"
+                ? Array.from(el.options).map(opt => ({ text: opt.text, value: opt.value }))
+                : null
+        });
+    }
+    return fields;
+}
+""" % FIELD_KEY_ATTRIBUTE
+
+
+def frame_path(frame):
+    """Child-frame indices leading from the main frame to `frame` ([] for the main frame)."""
+    path = []
+    while frame.parent_frame is not None:
+        path.append(frame.parent_frame.child_frames.index(frame))
+        frame = frame.parent_frame
+    return path[::-1]
+
+
+def frame_prefix(path):
+    """Prefix of the extraction keys in a frame, e.g. "1.0." for frame path [1, 0]."""
+    return "".join(f"{index}." for index in path)
+
+
+def build_field_info(raw, frame=None, path=None):
+    """
+    Turn a raw in-page field descriptor into the field dict used by the autofiller.
+
+    Fields found in a child frame carry the frame's path, url and name; together
+    with the selector (which pierces open shadow roots) they locate the element
+    directly, see find_frame().
+    """
+    label = raw["label"]
+    name_attr = raw["name"]
+    placeholder = raw["placeholder"]
+    field_info = {
+        "label": label,
+        "type": raw["type"],
+        "id": raw["id"],
+        "name": name_attr,
+        "placeholder": placeholder,
+        "value": raw["value"],
+        "class": raw["class"],
+        "role": raw["role"],
+        "is_required": raw["required"],
+        "field_type": determine_field_type(label, name_attr, placeholder, raw["type"], raw["class"]),
+        "selector": f"[{FIELD_KEY_ATTRIBUTE}='{raw['key']}']",
+        "frame_path": None,
+        "frame_url": None,
+        "frame_name": None,
+    }
+    if frame is not None and frame.parent_frame is not None:
+        field_info["frame_path"] = path if path is not None else frame_path(frame)
+        field_info["frame_url"] = frame.url
+        field_info["frame_name"] = frame.name
+    if raw["options"] is not None:
+        field_info["options"] = raw["options"]
+    return field_info
 
-            # Get the field's value if it exists
-            value = ""
+
+def is_important(field_info):
+    """Check if label, name, or placeholder matches important fields."""
+    combined_text = (f"{field_info['label']} {field_info['name']} {field_info['placeholder']}").lower()
+    return any(keyword in combined_text for keyword in IMPORTANT_KEYWORDS)
+
+
+def find_frame(page, field):
+    """
+    Return the frame an extracted field lives in, or None if it is gone.
+
+    The frame is found by its path, so same-URL (e.g. about:srcdoc) frames are
+    told apart; if the frames were reordered since, the first frame with the
+    field's URL and name is used. Keys are unique across frames, so a wrong
+    frame never holds the field's selector.
+    """
+    frame_url = field.get("frame_url")
+    if not frame_url:
+        return page.main_frame
+    frame = page.main_frame
+    try:
+        for index in field.get("frame_path") or ():
+            frame = frame.child_frames[index]
+    except IndexError:
+        frame = None
+    if frame is not None and frame is not page.main_frame and frame.url == frame_url:
+        return frame
+    frame_name = field.get("frame_name")
+    for frame in page.frames:
+        if frame.url == frame_url and (not frame_name or frame.name == frame_name):
+            return frame
+    return None
+
+
+class FieldWatcher:
+    """
+    Incrementally extracts important fields from a live page.
+
+    The first call to new_fields() returns every important field on the page.
+    When watching, later calls only return fields added to the DOM since the
+    previous call (conditional questions, next form steps, etc.), so the page
+    never has to be re-scanned as a whole. After a full navigation the new
+    document is scanned once and then watched again.
+
+    Every frame of the page (embedded ATS iframes included) is scanned with a
+    single in-page traversal that also walks open shadow roots.
+    """
+
+    def __init__(self, page, watch=True):
+        self.page = page
+        self.watch = watch
+
+    def new_fields(self):
+        """Return the important fields that have not been returned before."""
+        fields = []
+        for frame in self.page.frames:
             try:
-                if element_type == "select":
-                    value = element.evaluate("e => e.value")
-                else:
-                    value = element.get_attribute("value") or ""
+                path = frame_path(frame)
+                raw_fields = frame.evaluate(COLLECT_FIELDS_JS, {"watch": self.watch, "prefix": frame_prefix(path)})
             except Exception:
-                pass
-
-            field_info = {
-                "label": label,
-                "type": element_type,
-                "id": id_attr,
-                "name": name_attr,
-                "placeholder": placeholder,
-                "value": value,
-                "class": class_attr,
-                "is_required": element.get_attribute("required") is not None,
-                "field_type": determine_field_type(label, name_attr, placeholder, element_type, class_attr)
-            }
+                # Frame detached or navigating, it is picked up on the next call
+                continue
+            fields.extend(build_field_info(raw, frame, path) for raw in raw_fields)
+        return [field for field in fields if is_important(field)]
+
+
+def extract_fields_from_page(page):
+    """Extract the important fields from a page that is already loaded."""
+    return FieldWatcher(page, watch=False).new_fields()
+
+
+def extract_important_fields(url, browser_pool=None):
+    # Reuse a warm context when a pool is available instead of launching Chromium
+    if browser_pool:
+        with browser_pool.lease() as context:
+            page = context.new_page()
+            navigate(page, url)
+            return extract_fields_from_page(page)
 
-            # Check if label, name, or placeholder matches important fields
-            combined_text = (f"{label} {name_attr} {placeholder}").lower()
-            if any(keyword in combined_text for keyword in IMPORTANT_KEYWORDS):
-                important_fields.append(field_info)
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=False)  # See browser action during testing
+        page = browser.new_page()
+        navigate(page, url)
+
+        important_fields = extract_fields_from_page(page)
 
         browser.close()
 
@@ -104,12 +280,15 @@ def determine_field_type(label, name, placeholder, element_type, class_attr):
     """Determine the semantic type of the field based on its attributes."""
     combined_text = f"{label} {name} {placeholder} {class_attr}".lower()
     
-    # Check for select__input class pattern
-    if "select__input" in combined_text:
-        return "select-one"
-    
-    # Select fields
-    if element_type == "select-one":
+    # Select fields (native selects and select__input comboboxes). Questions the
+    # profile answers keep their semantic type; the rest are generic selects.
+    if element_type == "select-one" or "select__input" in combined_text:
+        if any(word in combined_text for word in WORK_AUTHORIZATION_WORDS):
+            return "work_authorization"
+        if "experience" in combined_text:
+            return "experience"
+        if "salary" in combined_text:
+            return "salary"
         return "select-one"  # Generic select field
     
     # File upload fields
@@ -117,7 +296,7 @@ def determine_field_type(label, name, placeholder, element_type, class_attr):
         return "file_upload"
     
     # Work authorization fields
-    if any(word in combined_text for word in ["authorized", "authorization", "work permit", "visa", "sponsorship"]):
+    if any(word in combined_text for word in WORK_AUTHORIZATION_WORDS):
         return "work_authorization"
     
     # Yes/No questions
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The agent modules import each other by module name (as when run from agent/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,65 @@
+from form_autofiller import FormAutofiller
+from user_profile import UserProfile
+
+
+class FakeButton:
+    def __init__(self, text):
+        self.text = text
+        self.clicked = False
+
+    def inner_text(self):
+        return self.text
+
+    def is_visible(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        self.clicked = True
+
+    def dispose(self):
+        pass
+
+
+class FakePage:
+    def __init__(self, elements):
+        self.elements = elements
+
+    def query_selector(self, selector):
+        return self.elements.get(selector)
+
+    def wait_for_load_state(self, state, timeout=None):
+        pass
+
+
+def _autofiller(elements):
+    autofiller = FormAutofiller(UserProfile())
+    autofiller.page = FakePage(elements)
+    return autofiller
+
+
+def test_next_button_is_clicked():
+    button = FakeButton("Next")
+    assert _autofiller({"button:has-text('Next')": button})._advance_step()
+    assert button.clicked
+
+
+def test_workday_submit_button_is_never_clicked():
+    button = FakeButton("Submit")
+    assert not _autofiller({"[data-automation-id='bottom-navigation-next-button']": button})._advance_step()
+    assert not button.clicked
+
+
+def test_continue_to_submit_is_never_clicked():
+    button = FakeButton("Continue to submit")
+    assert not _autofiller({"button:has-text('Continue')": button})._advance_step()
+    assert not button.clicked
+
+
+def test_review_step_stops_advancing():
+    button = FakeButton("Next")
+    elements = {"[data-automation-id='reviewJobApplicationPage']": object(), "button:has-text('Next')": button}
+    assert not _autofiller(elements)._advance_step()
+    assert not button.clicked
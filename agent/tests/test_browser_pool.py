@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from browser_pool import BrowserPool, ThreadPools
+
+
+class FakeSession:
+    def __init__(self, heap):
+        self.heap = heap
+
+    def send(self, method):
+        if method == "Performance.getMetrics":
+            return {"metrics": [{"name": "JSHeapUsedSize", "value": self.heap}]}
+        return {}
+
+    def detach(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+
+    def set_default_timeout(self, timeout):
+        pass
+
+    def cookies(self):
+        return []
+
+    def new_cdp_session(self, page):
+        return FakeSession(page)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def new_context(self, **kwargs):
+        return FakeContext()
+
+    def is_connected(self):
+        return True
+
+
+def _pool(size=1):
+    pool = BrowserPool(size=size)
+    pool.browser = FakeBrowser()
+    pool._refill("start")
+    return pool
+
+
+def test_refilled_contexts_are_not_counted_as_hits():
+    pool = _pool()
+    for _ in range(3):
+        pool.release(pool.acquire())
+    metrics = pool.metrics()
+    assert (metrics["hits"], metrics["refilled"], metrics["misses"]) == (1, 2, 0)
+    assert metrics["hit_rate"] == 1 / 3
+
+
+def test_released_context_is_closed_and_replaced():
+    pool = _pool()
+    context = pool.acquire()
+    pool.release(context)
+    assert context.closed
+    assert pool.metrics()["recycled"] == 1 and len(pool.idle) == 1
+
+
+def test_js_heap_is_reported_per_context():
+    pool = _pool(size=2)
+    first, second = pool.acquire(), pool.acquire()
+    first.pages = [1000, 500]  # Fake pages report their heap through the fake session
+    second.pages = [2000]
+    heaps = sorted(context["js_heap_bytes"] for context in pool.metrics()["contexts"])
+    assert heaps == [1500, 2000]
+    pool.release(first)
+    assert pool.metrics()["last_js_heap_bytes"] == 1500
+
+
+def test_thread_pools_close_on_their_own_threads(monkeypatch):
+    started, closed = [], []
+    monkeypatch.setattr(BrowserPool, "start", lambda self: started.append(threading.get_ident()) or self)
+    monkeypatch.setattr(BrowserPool, "close", lambda self: closed.append(threading.get_ident()))
+    pools = ThreadPools(size=1)
+    both_running = threading.Barrier(2)
+
+    def use_pool():
+        both_running.wait()  # Forces each call onto a different thread
+        return pools.get()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leased = list(executor.map(lambda _: use_pool(), range(2)))
+        pools.close_all(executor, 2)
+    assert leased[0] is not leased[1]
+    assert sorted(closed) == sorted(started)
@@ -0,0 +1,99 @@
+from combobox_driver import HARVEST_OPTIONS_JS, SELECTED_VALUE_JS, ComboboxDriver
+from select_field_handler import SelectFieldHandler
+
+URL = "https://boards.greenhouse.io/acme/jobs/1"
+FIELD = {"label": "Which office?", "class": "select__input"}
+
+
+class FakeWidget:
+    """A combobox input and its frame: clicking a tagged option selects it."""
+
+    def __init__(self, options):
+        self.options = options
+        self.typed = ""
+        self.shown = []
+        self.selected = None
+
+    # Frame
+    def locator(self, selector):
+        return self
+
+    @property
+    def first(self):
+        return self
+
+    def wait_for(self, **kwargs):
+        pass
+
+    def click(self, selector=None):
+        if selector:
+            self.selected = self.shown[int(selector.split("'")[1])]["text"]
+
+    # Element
+    def fill(self, text):
+        self.typed = text
+
+    def press(self, key):
+        pass
+
+    def evaluate(self, script):
+        if script == HARVEST_OPTIONS_JS:
+            self.shown = [o for o in self.options if self.typed.lower() in o["text"].lower()]
+            return self.shown
+        assert script == SELECTED_VALUE_JS
+        return self.selected
+
+
+def _options(*texts):
+    return [{"text": text, "value": text} for text in texts]
+
+
+def _handler():
+    handler = SelectFieldHandler()
+    handler.openai_api_key = None  # Direct matching only
+    return handler
+
+
+def test_harvested_pick_is_cached():
+    driver = ComboboxDriver()
+    widget = FakeWidget(_options("Berlin", "London"))
+    assert driver.fill(widget, widget, FIELD, "London", URL, _handler()) == "London"
+    assert widget.selected == "London"
+    assert driver.option_cache[driver.cache_key(URL, FIELD)] == _options("Berlin", "London")
+
+
+def test_stale_cache_entry_falls_back_to_harvest():
+    driver = ComboboxDriver()
+    key = driver.cache_key(URL, FIELD)
+    # Another Greenhouse posting asked the same question with other offices
+    driver.option_cache[key] = _options("London", "Paris")
+    widget = FakeWidget(_options("Berlin", "Lisbon"))
+    assert driver.fill(widget, widget, FIELD, "Berlin", URL, _handler()) == "Berlin"
+    assert widget.selected == "Berlin"
+    assert driver.option_cache[key] == _options("Berlin", "Lisbon")
+
+
+def test_cached_option_missing_from_menu_is_not_reported_filled():
+    driver = ComboboxDriver()
+    key = driver.cache_key(URL, FIELD)
+    driver.option_cache[key] = _options("London", "Paris")
+    widget = FakeWidget(_options("Berlin", "Lisbon"))
+    assert driver.fill(widget, widget, FIELD, "London", URL, _handler()) is None
+    assert widget.selected is None
+
+
+def test_stale_entry_dropped_by_another_thread_is_harvested():
+    driver = ComboboxDriver()
+    key = driver.cache_key(URL, FIELD)
+    driver.option_cache[key] = _options("London", "Paris")
+    handler = _handler()
+    match = handler.match_select_option
+
+    def match_while_another_thread_drops(options, value, select_type):
+        # Another worker finds the same entry stale and drops it first
+        driver.option_cache.pop(key, None)
+        return match(options, value, select_type)
+
+    handler.match_select_option = match_while_another_thread_drops
+    widget = FakeWidget(_options("Berlin", "Lisbon"))
+    assert driver.fill(widget, widget, FIELD, "Berlin", URL, handler) == "Berlin"
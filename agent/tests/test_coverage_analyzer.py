@@ -0,0 +1,53 @@
+from combobox_driver import ComboboxDriver
+from coverage_analyzer import analyze_fields, resolve_field
+from select_field_handler import SelectFieldHandler
+from user_profile import UserProfile
+
+URL = "https://boards.greenhouse.io/acme/jobs/1"
+
+EMAIL = {"label": "Email", "name": "email", "type": "email", "field_type": "email", "is_required": True}
+NOTICE = {"label": "Notice period", "name": "notice", "type": "select-one", "field_type": "select-one",
+          "is_required": False, "options": [{"text": "Immediately", "value": "1"}, {"text": "Half a month", "value": "2"}]}
+COMBO_NOTICE = {"label": "Notice period", "name": "notice_combo", "type": "text", "class": "select__input",
+                "field_type": "select-one", "is_required": False}
+COVER = {"label": "Cover letter", "name": "q7", "type": "text", "field_type": "text", "is_required": True}
+
+
+def _setup():
+    profile = UserProfile.from_dict({"email": "ada@example.com", "notice_period": "2 weeks"})
+    handler = SelectFieldHandler()
+    handler.openai_api_key = "test-key"  # Only checked, never called
+    return profile, handler
+
+
+def test_text_field_comes_from_the_profile():
+    profile, handler = _setup()
+    assert resolve_field(EMAIL, profile, handler) == (True, "profile", 0)
+
+
+def test_unmatched_select_needs_the_llm():
+    profile, handler = _setup()
+    answerable, source, tokens = resolve_field(NOTICE, profile, handler)
+    assert (answerable, source) == (True, "llm") and tokens > 0
+
+
+def test_combobox_without_cached_options_is_unknown():
+    profile, handler = _setup()
+    assert resolve_field(COMBO_NOTICE, profile, handler, URL, ComboboxDriver()) == (True, "unknown_options", 0)
+
+
+def test_combobox_uses_cached_options():
+    profile, handler = _setup()
+    driver = ComboboxDriver()
+    driver.option_cache[driver.cache_key(URL, COMBO_NOTICE)] = NOTICE["options"]
+    assert resolve_field(COMBO_NOTICE, profile, handler, URL, driver)[1] == "llm"
+
+
+def test_analyze_fields_summarizes_a_posting():
+    profile, handler = _setup()
+    row = analyze_fields(URL, [EMAIL, NOTICE, COMBO_NOTICE, COVER], profile, handler, ComboboxDriver())
+    assert row["fields"] == 4 and row["answerable"] == 3
+    assert row["required_fields"] == 2 and row["required_coverage"] == 0.5
+    assert row["unanswered_required_labels"] == "Cover letter"
+    assert row["llm_fields"] == 1 and row["est_llm_cost_usd"] > 0
+    assert row["unknown_option_fields"] == 1 and row["unknown_option_labels"] == "Notice period"
@@ -0,0 +1,69 @@
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+import failures
+from failures import classify_exception, navigate, retry_transient
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(failures.time, "sleep", lambda seconds: None)
+
+
+class FakePage:
+    def __init__(self, goto_errors=(), idle=True):
+        self.goto_errors = list(goto_errors)
+        self.idle = idle
+        self.gotos = 0
+
+    def goto(self, url, wait_until, timeout):
+        self.gotos += 1
+        if self.goto_errors:
+            raise self.goto_errors.pop(0)
+
+    def wait_for_load_state(self, state, timeout):
+        if not self.idle:
+            raise PlaywrightTimeoutError("Timeout waiting for networkidle")
+
+
+def test_exhausted_retries_are_not_retryable():
+    def action():
+        raise PlaywrightTimeoutError("Timeout 20000ms exceeded")
+
+    with pytest.raises(PlaywrightTimeoutError) as info:
+        retry_transient(action, "navigation", attempts=2)
+    assert classify_exception(info.value, "navigation")["retryable"] is False
+
+
+def test_fresh_navigation_timeout_is_retryable():
+    failure = classify_exception(PlaywrightTimeoutError("Timeout"), "navigation")
+    assert failure["retryable"] is True
+
+
+def test_navigate_retries_transient_failures():
+    page = FakePage(goto_errors=[PlaywrightTimeoutError("Timeout")])
+    navigate(page, "https://example.com", timeout=1000)
+    assert page.gotos == 2
+
+
+def test_navigate_accepts_page_that_never_goes_idle():
+    page = FakePage(idle=False)
+    navigate(page, "https://example.com", timeout=1000)
+    assert page.gotos == 1
+
+
+def test_navigate_shares_one_budget_across_attempts(monkeypatch):
+    clock = iter([0.0, 0.0, 2.0, 2.0, 2.0])
+    monkeypatch.setattr(failures.time, "monotonic", lambda: next(clock))
+    page = FakePage(goto_errors=[PlaywrightTimeoutError("Timeout")])
+    with pytest.raises(failures.AutofillError) as info:
+        navigate(page, "https://example.com", timeout=1000)
+    assert page.gotos == 1
+    assert classify_exception(info.value, "navigation")["retryable"] is False
+
+
+def test_submit_phase_failures_are_never_retryable():
+    error = PlaywrightError("net::ERR_CONNECTION_RESET at https://example.com/apply")
+    assert classify_exception(error, "fill")["retryable"]
+    assert not classify_exception(error, "submit")["retryable"]
@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+
+import browser_pool
+import fan_out
+from fan_out import FillPlan, PlanStep, _stable_selector, build_fill_plan, fan_out as run_fan_out
+from user_profile import UserProfile
+
+
+@pytest.fixture
+def closed_pools(monkeypatch):
+    closed = []
+    monkeypatch.setattr(browser_pool.BrowserPool, "start", lambda self: self)
+    monkeypatch.setattr(browser_pool.BrowserPool, "close", lambda self: closed.append(threading.get_ident()))
+    return closed
+
+
+def _field(**attributes):
+    return {"label": "Email", "type": "email", "field_type": "email",
+            "selector": "[data-autofill-key='3']", **attributes}
+
+
+def test_stable_selector_prefers_id_then_name():
+    assert _stable_selector(_field(id="email", name="email")) == '[id="email"]'
+    assert _stable_selector(_field(name="email")) == '[name="email"]'
+    # Radio groups share a name, so only the extraction key finds the right one
+    assert _stable_selector(_field(name="yes_no", type="radio")) == "[data-autofill-key='3']"
+
+
+def test_plan_needs_tagging_only_for_key_selectors():
+    resolved = ("value", "email")
+    assert not FillPlan("u", [PlanStep(_field(selector='[id="email"]'), resolved)]).needs_tagging
+    assert FillPlan("u", [PlanStep(_field(), resolved)]).needs_tagging
+
+
+def test_build_fill_plan_keeps_answerable_fields(monkeypatch):
+    cover = {"label": "Cover letter", "name": "q7", "type": "textarea", "field_type": "text",
+             "selector": "[data-autofill-key='4']"}
+    monkeypatch.setattr(fan_out, "extract_important_fields", lambda url, pool: [_field(name="email"), cover])
+    plan = build_fill_plan("https://example.com/job")
+    assert [step.field["selector"] for step in plan.steps] == ['[name="email"]']
+    assert plan.steps[0].resolved == ("value", "email")
+    assert plan.value_for(plan.steps[0], UserProfile.from_dict({"email": "ada@example.com"})) == "ada@example.com"
+
+
+def test_every_worker_closes_its_pool_even_when_a_fill_raises(monkeypatch, closed_pools):
+    class FailingAutofiller:
+        def __init__(self, profile, browser_pool, **kwargs):
+            pass
+
+        def apply_plan(self, plan, **kwargs):
+            raise RuntimeError("worker crashed")
+
+        def close_browser(self):
+            pass
+
+    monkeypatch.setattr(fan_out, "FormAutofiller", FailingAutofiller)
+    with pytest.raises(RuntimeError):
+        run_fan_out(FillPlan("u", []), [UserProfile(), UserProfile(), UserProfile()], workers=2)
+    # One close per worker thread that started a pool, each on its own thread
+    assert len(closed_pools) == len(set(closed_pools)) >= 1
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from field_classifier import NO_ANSWER, FieldClassifier
+from form_autofiller import FormAutofiller
+from user_profile import UserProfile
+
+EMAIL = {"label": "Email address", "name": "email", "type": "email", "field_type": "email"}
+COVER = {"label": "Cover letter", "name": "q7", "type": "textarea", "field_type": "text"}
+
+
+def _classifier():
+    fields = [EMAIL, dict(EMAIL, label="E-mail"), COVER, dict(COVER, label="Cover letter (optional)")]
+    labels = [("value", "email"), ("value", "email"), NO_ANSWER, NO_ANSWER]
+    return FieldClassifier.train(fields, labels, epochs=100)
+
+
+def test_no_answer_prediction_leaves_field_to_rules():
+    fields = [dict(EMAIL), dict(COVER)]
+    _classifier().annotate(fields)
+    assert fields[0]["resolved"] == ("value", "email")
+    assert "resolved" not in fields[1]
+
+
+FILLED = {"field": "Email address", "value": "ada@example.com", "status": "filled"}
+
+
+def _logged(tmp_path, field, entry=None):
+    log = tmp_path / "fills.jsonl"
+    FormAutofiller(UserProfile(), training_log=str(log))._log_training_example(field, entry)
+    return [json.loads(line) for line in log.read_text().splitlines()] if log.exists() else []
+
+
+def test_training_label_comes_from_rules(tmp_path):
+    # A (wrong) classifier prediction must not become the label
+    records = _logged(tmp_path, dict(EMAIL, resolved=("value", "phone")), FILLED)
+    assert records[0]["resolved"] == ["value", "email"]
+
+
+def test_unanswerable_field_is_logged_as_no_answer(tmp_path):
+    assert _logged(tmp_path, dict(COVER))[0]["resolved"] == list(NO_ANSWER)
+
+
+def test_classifier_only_answer_is_not_logged(tmp_path):
+    assert _logged(tmp_path, dict(COVER, resolved=("value", "website"))) == []
+
+
+def test_failed_fill_is_not_logged(tmp_path):
+    failed = dict(FILLED, status="failed - no matching option")
+    assert _logged(tmp_path, dict(EMAIL), failed) == []
+    assert _logged(tmp_path, dict(EMAIL)) == []
@@ -0,0 +1,48 @@
+from simple_form_extractor import determine_field_type
+from user_profile import UserProfile
+
+
+YES_NO_OPTIONS = [{"text": "Yes", "value": "1"}, {"text": "No", "value": "0"}]
+
+
+def _select_field(label):
+    field_type = determine_field_type(label, "question_1", "", "select-one", "")
+    return {
+        "label": label, "name": "question_1", "type": "select-one",
+        "field_type": field_type, "options": YES_NO_OPTIONS,
+    }
+
+
+def test_select_authorization_question_gets_semantic_type():
+    field = _select_field("Are you legally authorized to work in the US?")
+    assert field["field_type"] == "work_authorization"
+
+
+def test_select_authorization_question_is_answered():
+    profile = UserProfile.from_dict({"name": "Ada", "work_authorized": True, "requires_sponsorship": False})
+    assert profile.get_value_for_field(_select_field("Are you legally authorized to work in the US?")) == "1"
+    assert profile.get_value_for_field(_select_field("Will you require visa sponsorship?")) == "0"
+
+
+def test_select_experience_question_gets_semantic_type():
+    assert _select_field("Years of experience")["field_type"] == "experience"
+
+
+def test_other_selects_stay_generic():
+    assert _select_field("How did you hear about us?")["field_type"] == "select-one"
+
+
+def test_select_experience_question_is_answered_with_a_bucket():
+    profile = UserProfile.from_dict({"name": "Ada", "years_experience": 6})
+    field = _select_field("Years of experience")
+    field["options"] = [{"text": label, "value": label} for label in ("0-1", "1-3", "3-5", "5-10", "10+")]
+    assert profile.get_value_for_field(field) == "5-10"
+    field.pop("options")
+    assert profile.get_value_for_field(field) == "6"
+
+
+def test_select_option_spelling_the_value_is_returned_as_is():
+    profile = UserProfile.from_dict({"name": "Ada", "citizenship": "us citizen "})
+    field = {"label": "Citizenship", "name": "citizenship", "type": "select-one", "field_type": "select-one",
+             "options": [{"text": "US Citizen", "value": "1"}, {"text": "Other", "value": "2"}]}
+    assert profile.value_for(("value", "citizenship"), field["options"]) == "US Citizen"
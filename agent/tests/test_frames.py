@@ -0,0 +1,52 @@
+from simple_form_extractor import build_field_info, find_frame, frame_path, frame_prefix
+
+
+class FakeFrame:
+    def __init__(self, url, parent=None, name=""):
+        self.url = url
+        self.name = name
+        self.parent_frame = parent
+        self.child_frames = []
+        if parent is not None:
+            parent.child_frames.append(self)
+
+
+class FakePage:
+    def __init__(self):
+        self.main_frame = FakeFrame("https://example.com/job")
+        self.first = FakeFrame("about:srcdoc", self.main_frame)
+        self.second = FakeFrame("about:srcdoc", self.main_frame)
+
+    @property
+    def frames(self):
+        return [self.main_frame, self.first, self.second]
+
+
+def _raw(key):
+    return {
+        "key": key, "tag": "input", "type": "text", "id": None, "name": "email",
+        "placeholder": "", "class": "", "role": "", "label": "Email",
+        "value": "", "required": False, "options": None,
+    }
+
+
+def test_keys_are_prefixed_per_frame():
+    page = FakePage()
+    assert frame_prefix(frame_path(page.main_frame)) == ""
+    assert frame_prefix(frame_path(page.first)) == "0."
+    assert frame_prefix(frame_path(page.second)) == "1."
+
+
+def test_same_url_frames_are_told_apart():
+    page = FakePage()
+    field = build_field_info(_raw("1.0"), page.second)
+    assert field["selector"] == "[data-autofill-key='1.0']"
+    assert find_frame(page, field) is page.second
+
+
+def test_reordered_frames_fall_back_to_the_url():
+    page = FakePage()
+    field = build_field_info(_raw("1.0"), page.second)
+    page.main_frame.child_frames.remove(page.second)
+    assert find_frame(page, field) is page.first
+    assert find_frame(page, build_field_info(_raw("0"), page.main_frame)) is page.main_frame
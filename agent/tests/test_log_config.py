@@ -0,0 +1,44 @@
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from log_config import DeferredQueueHandler, JsonFormatter
+
+
+def _logger(stream):
+    records = queue.SimpleQueue()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter())
+    logger = logging.getLogger("test_log_config")
+    logger.propagate = False
+    logger.handlers = [DeferredQueueHandler(records)]
+    return logger, QueueListener(records, output)
+
+
+def test_exceptions_are_formatted_by_the_listener():
+    stream = io.StringIO()
+    logger, listener = _logger(stream)
+    listener.start()
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Form %s failed", "job-1")
+    listener.stop()
+
+    entry = json.loads(stream.getvalue())
+    assert entry["msg"] == "Form job-1 failed"
+    assert "ValueError: boom" in entry["exc"]
+
+
+def test_arguments_are_merged_when_the_record_is_queued():
+    stream = io.StringIO()
+    logger, listener = _logger(stream)
+    fields = ["email"]
+    logger.warning("Filled %s", fields)
+    fields.append("phone")
+    listener.start()
+    listener.stop()
+
+    assert json.loads(stream.getvalue())["msg"] == "Filled ['email']"
@@ -0,0 +1,51 @@
+import memory_monitor
+from memory_monitor import MemoryGovernor
+
+
+class FakePool:
+    def __init__(self, pids):
+        self.browser = object()
+        self.pids = pids
+        self.jobs_since_start = 1
+        self.restarted = False
+
+    def browser_pids(self):
+        return self.pids
+
+    def metrics(self):
+        return {"last_js_heap_bytes": 0, "recycled": 1}
+
+    def restart(self):
+        self.restarted = True
+
+
+def test_unlisted_browser_processes_skip_the_browser_limit(monkeypatch):
+    monkeypatch.setattr(memory_monitor, "process_rss", lambda pid: 10 * memory_monitor.MB)
+    pool = FakePool(pids=[])
+    report = MemoryGovernor(max_browser_mb=1).after_job(pool)
+    assert report["browser_rss_mb"] is None
+    assert report["browser_restarted"] == []
+    assert not pool.restarted
+
+
+def test_browser_over_its_limit_is_restarted(monkeypatch):
+    monkeypatch.setattr(memory_monitor, "process_rss", lambda pid: 10 * memory_monitor.MB)
+    pool = FakePool(pids=[1, 2])
+    report = MemoryGovernor(max_browser_mb=15).after_job(pool)
+    assert report["browser_rss_mb"] == 20
+    assert report["browser_restarted"] == ["browser_rss"]
+
+
+def test_handle_census_is_opt_in(monkeypatch):
+    monkeypatch.setattr(memory_monitor, "live_element_handles", lambda: 3)
+    pool = FakePool(pids=[])
+    assert MemoryGovernor().after_job(pool)["live_element_handles"] is None
+    assert MemoryGovernor(count_handles=True).after_job(pool)["live_element_handles"] == 3
+
+
+def test_unlisted_processes_are_only_reported_with_a_browser_limit(monkeypatch, caplog):
+    monkeypatch.setattr(memory_monitor, "process_rss", lambda pid: 0)
+    MemoryGovernor().after_job(FakePool(pids=[]))
+    assert "Could not list" not in caplog.text
+    MemoryGovernor(max_browser_mb=1).after_job(FakePool(pids=[]))
+    assert "Could not list" in caplog.text
@@ -0,0 +1,30 @@
+from page_snapshots import _filled_summary, _redact
+
+
+def _result(*entries):
+    return {"filled_fields": [{"field": field, "value": value, "status": "filled"} for field, value in entries]}
+
+
+def test_summary_matches_same_fill():
+    recorded = _result(("First name", "Ada"), ("Email", "ada@example.com"))
+    replayed = _result(("Email", "ada@example.com"), ("First name", "Ada"))
+    assert _filled_summary(recorded) == _filled_summary(replayed)
+
+
+def test_summary_detects_swapped_values():
+    recorded = _result(("First name", "Ada"), ("Last name", "Lovelace"))
+    replayed = _result(("First name", "Lovelace"), ("Last name", "Ada"))
+    assert _filled_summary(recorded) != _filled_summary(replayed)
+
+
+def test_summary_of_failed_run_is_empty():
+    assert _filled_summary({"error": "Timeout", "failure": {}}) == []
+
+
+def test_credentials_are_redacted():
+    headers = [
+        {"name": "Cookie", "value": "session=secret"},
+        {"name": "authorization", "value": "Bearer secret"},
+        {"name": "Content-Type", "value": "text/html"},
+    ]
+    assert [header["value"] for header in _redact(headers)] == ["[redacted]", "[redacted]", "text/html"]
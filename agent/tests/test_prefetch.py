@@ -0,0 +1,80 @@
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+import prefetch
+from prefetch import PrefetchScheduler, PreparedForm
+from user_profile import UserProfile
+
+
+class FakePage:
+    def __init__(self):
+        self.visited = []
+
+    def on(self, event, handler):
+        pass
+
+    def goto(self, url, **kwargs):
+        self.visited.append(url)
+
+
+class FakeContext:
+    def new_page(self):
+        return FakePage()
+
+
+class FakePool:
+    def __init__(self, error=None):
+        self.error = error
+
+    def acquire(self):
+        if self.error:
+            raise self.error
+        return FakeContext()
+
+
+def test_preload_keeps_a_failed_lease_as_the_form_error():
+    error = RuntimeError("browser crashed")
+    prepared = PrefetchScheduler(profile=None)._preload(FakePool(error), "https://example.com/job")
+    assert prepared.error is error
+    assert prepared.context is None and prepared.extracted
+
+
+def test_preload_attaches_a_recorder_when_snapshotting(monkeypatch):
+    monkeypatch.setattr(prefetch, "SnapshotRecorder", lambda page: ("recorder", page))
+    scheduler = PrefetchScheduler(profile=None, snapshot_dir="snapshots")
+    prepared = scheduler._preload(FakePool(), "https://example.com/job")
+    assert prepared.error is None
+    assert prepared.recorder == ("recorder", prepared.page)
+    assert prepared.page.visited == ["https://example.com/job"]
+
+
+class BusyPage(FakePage):
+    """A page whose network never goes idle."""
+
+    frames = []
+
+    def __init__(self):
+        super().__init__()
+        self.waited = []
+
+    def wait_for_load_state(self, state, timeout=None):
+        self.waited.append(state)
+        if state == "networkidle":
+            raise PlaywrightTimeoutError("never idle")
+
+
+def _loaded_form():
+    return PreparedForm("https://example.com/job", FakeContext(), BusyPage())
+
+
+def test_page_that_never_goes_idle_is_extracted():
+    prepared = _loaded_form()
+    PrefetchScheduler(profile=UserProfile())._extract(prepared, llm=None)
+    assert prepared.error is None
+    assert prepared.fields == []
+
+
+def test_forms_ahead_do_not_wait_for_network_idle():
+    prepared = _loaded_form()
+    PrefetchScheduler(profile=UserProfile())._extract(prepared, llm=None, wait_for_idle=False)
+    assert prepared.fields == []
+    assert "networkidle" not in prepared.page.waited
@@ -0,0 +1,31 @@
+import os
+
+from resume_assets import ResumeManager
+
+
+def _write(path, content, mtime):
+    path.write_bytes(content)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_replaced_resume_is_loaded_again(tmp_path):
+    resume = tmp_path / "resume.pdf"
+    _write(resume, b"first", 1_000_000_000)
+    manager = ResumeManager()
+    assert manager.get(str(resume)).content == b"first"
+    assert manager.get(str(resume)) is manager.get(str(resume))
+
+    _write(resume, b"second", 2_000_000_000)
+    assert manager.get(str(resume)).content == b"second"
+
+
+def test_failures_are_not_remembered_once_the_file_is_fixed(tmp_path):
+    resume = tmp_path / "resume.pdf"
+    manager = ResumeManager()
+    assert manager.get(str(resume)) is None
+
+    _write(resume, b"", 1_000_000_000)
+    assert manager.get(str(resume)) is None
+
+    _write(resume, b"fixed", 2_000_000_000)
+    assert manager.get(str(resume)).content == b"fixed"
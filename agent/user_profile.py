@@ -2,177 +2,326 @@
 User profile information for autofilling job applications.
 """
 
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Every profile attribute with its expected type and default value.
+# The order here is also the order used when saving a profile to JSON.
+PROFILE_FIELDS = {
+    # Basic information
+    "name": (str, ""),
+    "email": (str, ""),
+    "phone": (str, ""),
+    "linkedin": (str, ""),
+    "address": (str, ""),
+    "resume_path": (str, ""),
+
+    # Additional information
+    "website": (str, ""),
+    "github": (str, ""),
+    "portfolio": (str, ""),
+    "summary": (str, ""),
+
+    # Work experience
+    "current_company": (str, ""),
+    "current_position": (str, ""),
+    "years_experience": (int, 0),
+
+    # Education
+    "education": (list, []),
+    "skills": (list, []),
+
+    # Work Authorization
+    "work_authorized": (bool, True),  # Default to True, update as needed
+    "requires_sponsorship": (bool, False),  # Default to False, update as needed
+    "citizenship": (str, "US Citizen"),  # e.g., "US Citizen", "Permanent Resident"
+    "visa_status": (str, ""),  # e.g., "H1B", "Green Card"
+
+    # Job Preferences
+    "desired_salary": (str, "100000"),
+    "notice_period": (str, "2 weeks"),  # Default notice period
+    "available_start_date": (str, ""),  # Leave empty for immediate
+    "willing_to_relocate": (bool, True),
+    "preferred_work_location": (str, ""),  # e.g., "Remote", "San Francisco, CA"
+
+    # Voluntary self-identification (U.S. demographic questions)
+    "gender": (str, "Decline to self identify"),
+    "race_ethnicity": (str, "Decline to self identify"),
+    "veteran_status": (str, "I don't wish to answer"),
+    "disability_status": (str, "I don't wish to answer"),
+}
+
+# Semantic field types (from simple_form_extractor.determine_field_type) that map
+# straight onto a profile value.
+FIELD_TYPE_ATTRIBUTES = {
+    "name": "name",
+    "email": "email",
+    "phone": "phone",
+    "linkedin": "linkedin",
+    "address": "address",
+    "salary": "desired_salary",
+    "experience": "experience",
+}
+
+# Keyword fallback used when the field type alone is not enough, checked in order.
+KEYWORD_ATTRIBUTES = [
+    (("name", "full name", "fullname"), "name"),
+    (("email", "e-mail"), "email"),
+    (("phone", "telephone", "mobile", "cell"), "phone"),
+    (("linkedin", "linked-in", "linked in"), "linkedin"),
+    (("address", "location"), "address"),
+    (("website", "web site", "personal site"), "website"),
+    (("github", "git hub"), "github"),
+    (("portfolio",), "portfolio"),
+    (("summary", "about", "bio"), "summary"),
+    (("salary", "compensation", "pay"), "desired_salary"),
+    (("notice", "notice period"), "notice_period"),
+    (("start date", "available"), "available_start_date"),
+    (("gender",), "gender"),
+    (("race", "ethnicity", "hispanic"), "race_ethnicity"),
+    (("veteran",), "veteran_status"),
+    (("disability",), "disability_status"),
+]
+
+# Upper bounds for the experience buckets used by select fields.
+EXPERIENCE_BUCKETS = [(1, "0-1"), (3, "1-3"), (5, "3-5"), (10, "5-10")]
+
+YES_OPTIONS = ("yes", "y", "true")
+NO_OPTIONS = ("no", "n", "false")
+
+
+def experience_bucket(years):
+    """Return the experience range label (e.g. "3-5") for a number of years."""
+    for upper, label in EXPERIENCE_BUCKETS:
+        if years < upper:
+            return label
+    return "10+"
+
+
+def _coerce(key, value):
+    """Validate a profile value against PROFILE_FIELDS, converting where it is safe."""
+    expected, _ = PROFILE_FIELDS[key]
+    if expected is str:
+        if value is None:
+            return ""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        if isinstance(value, str):
+            return value
+    elif expected is int:
+        if isinstance(value, bool):
+            pass
+        elif isinstance(value, (int, float)):
+            return int(value)
+        elif isinstance(value, str) and value.strip().isdigit():
+            return int(value.strip())
+        elif value is None or value == "":
+            return 0
+    elif expected is bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.strip().lower() in YES_OPTIONS + ("1",):
+            return True
+        if isinstance(value, str) and value.strip().lower() in NO_OPTIONS + ("0",):
+            return False
+    elif expected is list:
+        if value is None:
+            return []
+        if isinstance(value, (list, tuple)):
+            return list(value)
+    raise ValueError(f"Invalid value for '{key}': expected {expected.__name__}, got {value!r}")
+
+
 class UserProfile:
+    __slots__ = tuple(PROFILE_FIELDS) + ("_lookups",)
+
     def __init__(self):
-        # Basic information
-        self.name = ""
-        self.email = ""
-        self.phone = ""
-        self.linkedin = ""
-        self.address = ""
-        self.resume_path = ""
-        
-        # Additional information
-        self.website = ""
-        self.github = ""
-        self.portfolio = ""
-        self.summary = ""
-        
-        # Work experience
-        self.current_company = ""
-        self.current_position = ""
-        self.years_experience = 0
-        
-        # Education
-        self.education = []
-        self.skills = []
-        
-        # Work Authorization
-        self.work_authorized = True  # Default to True, update as needed
-        self.requires_sponsorship = False  # Default to False, update as needed
-        self.citizenship = "US Citizen"  # e.g., "US Citizen", "Permanent Resident"
-        self.visa_status = ""  # e.g., "H1B", "Green Card"
-        
-        # Job Preferences
-        self.desired_salary = "100000"
-        self.notice_period = "2 weeks"  # Default notice period
-        self.available_start_date = ""  # Leave empty for immediate
-        self.willing_to_relocate = True
-        self.preferred_work_location = ""  # e.g., "Remote", "San Francisco, CA"
-        
+        for key, (_, default) in PROFILE_FIELDS.items():
+            setattr(self, key, list(default) if isinstance(default, list) else default)
+
+    def __setattr__(self, key, value):
+        if key in PROFILE_FIELDS:
+            value = _coerce(key, value)
+            # Any change to a profile value invalidates the precomputed lookups
+            object.__setattr__(self, "_lookups", None)
+        object.__setattr__(self, key, value)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create a profile from a dictionary, validating every known key."""
+        profile = cls()
+        profile.update_from_dict(data)
+        return profile
+
+    def update_from_dict(self, data):
+        """Update the profile from a dictionary. Unknown keys are ignored."""
+        if not isinstance(data, dict):
+            raise ValueError(f"Profile data must be an object, got {type(data).__name__}")
+        for key, value in data.items():
+            if key in PROFILE_FIELDS:
+                setattr(self, key, value)
+        self._build_lookups()
+
+    def to_dict(self):
+        """Return the profile as a plain dictionary."""
+        return {key: getattr(self, key) for key in PROFILE_FIELDS}
+
     def load_from_file(self, file_path):
         """Load user profile from a JSON file."""
-        import json
         try:
             with open(file_path, 'r') as f:
-                data = json.load(f)
-                for key, value in data.items():
-                    if hasattr(self, key):
-                        setattr(self, key, value)
+                self.update_from_dict(json.load(f))
             return True
         except Exception as e:
-            print(f"Error loading profile: {e}")
+            logger.error("Error loading profile %s: %s", file_path, e)
             return False
-            
+
     def save_to_file(self, file_path):
         """Save user profile to a JSON file."""
-        import json
         try:
-            data = {attr: getattr(self, attr) for attr in dir(self) 
-                   if not attr.startswith('_') and not callable(getattr(self, attr))}
             with open(file_path, 'w') as f:
-                json.dump(data, f, indent=4)
+                json.dump(self.to_dict(), f, indent=4)
             return True
         except Exception as e:
-            print(f"Error saving profile: {e}")
+            logger.error("Error saving profile %s: %s", file_path, e)
             return False
-            
-    def get_value_for_field(self, field_info):
-        """Get the appropriate value for a form field based on its information."""
-        # Debug: Print all arguments and their types
-        import inspect
-        frame = inspect.currentframe()
-        args, _, _, values = inspect.getargvalues(frame)
-        print("\nDEBUG - get_value_for_field arguments:")
-        for arg in args:
-            print(f"  {arg}: {values[arg]}")
-        
-        field_type = field_info.get('field_type', '')
-        field_label = field_info.get('label', '').lower() if field_info.get('label') else ""
-        field_name = field_info.get('name', '').lower() if field_info.get('name') else ""
-        field_id = field_info.get('id', '').lower() if field_info.get('id') else ""
-        options = field_info.get('options', [])
-        
-        # Debug: Print field info
-        print("\nDEBUG - Field info:")
-        print(f"  field_type: {field_type}")
-        print(f"  field_label: {field_label}")
-        print(f"  field_name: {field_name}")
-        print(f"  field_id: {field_id}")
-        print(f"  options: {options}")
-        
+
+    def _build_lookups(self):
+        """Precompute normalized values and answers so field resolution is a dict lookup."""
+        values = {key: getattr(self, key) for key, (kind, _) in PROFILE_FIELDS.items() if kind is str}
+        values["experience"] = str(self.years_experience)
+        values["experience_bucket"] = experience_bucket(self.years_experience)
+        normalized = {key: value.strip().lower() for key, value in values.items()}
+        lookups = {
+            "values": values,
+            "normalized": normalized,
+            "yes_no": {
+                "authorized": self.work_authorized,
+                "sponsorship": self.requires_sponsorship,
+                "relocate": self.willing_to_relocate,
+                "remote": "remote" in normalized["preferred_work_location"],
+            },
+        }
+        object.__setattr__(self, "_lookups", lookups)
+        return lookups
+
+    @property
+    def lookups(self):
+        """Precomputed values, normalized values and yes/no answers for this profile."""
+        return self._lookups or self._build_lookups()
+
+    @staticmethod
+    def resolve_field(field_info):
+        """
+        Work out which profile answer a field needs. This does not depend on the
+        profile's values, so one resolution can be reused for many candidates.
+
+        Returns:
+            tuple: ("value", key) or ("yes_no", key), or None if nothing matches.
+        """
+        return UserProfile._resolve_key(
+            field_info.get('field_type', ''),
+            field_info.get('label', '').lower() if field_info.get('label') else "",
+            field_info.get('name', '').lower() if field_info.get('name') else "",
+            field_info.get('id', '').lower() if field_info.get('id') else "",
+        )
+
+    def value_for(self, resolved, options=None):
+        """Return this profile's answer for a resolution from resolve_field()."""
+        if resolved is None:
+            return None
+        kind, key = resolved
+        lookups = self.lookups
+        if kind == "yes_no":
+            if key not in lookups["yes_no"]:
+                return None
+            return self._get_yes_no_value(lookups["yes_no"][key], options)
+        if not options:
+            return lookups["values"].get(key)
+        if key == "experience":
+            # Experience selects offer ranges ("3-5", "5-10"), not a number of years
+            key = "experience_bucket"
+        # An option that spells the value exactly needs no fuzzy or LLM matching
+        normalized = lookups["normalized"].get(key)
+        for option in options:
+            if normalized and option["text"].strip().lower() == normalized:
+                return option["text"]
+        return lookups["values"].get(key)
+
+    @staticmethod
+    def _resolve_key(field_type, field_label, field_name, field_id):
+        """
+        Work out which precomputed answer a field needs.
+
+        Returns:
+            tuple: ("value", key) or ("yes_no", key), or None if nothing matches.
+        """
         # Handle file uploads
         if field_type == 'file_upload':
             if 'resume' in field_label or 'cv' in field_label or field_id == 'resume':
-                return self.resume_path
+                return ("value", "resume_path")
             return None  # Don't know what file to upload for other types
-            
+
         # Handle work authorization questions
         if field_type == 'work_authorization':
             if 'authorized' in field_label or 'authorization' in field_label:
-                return self._get_yes_no_value(self.work_authorized, options)
+                return ("yes_no", "authorized")
             if 'sponsorship' in field_label:
-                return self._get_yes_no_value(self.requires_sponsorship, options)
+                return ("yes_no", "sponsorship")
             if 'citizenship' in field_label:
-                return self.citizenship
+                return ("value", "citizenship")
             if 'visa' in field_label:
-                return self.visa_status
-                
+                return ("value", "visa_status")
+
         # Handle yes/no questions
         if field_type == 'yes_no':
             if 'relocate' in field_label:
-                return self._get_yes_no_value(self.willing_to_relocate, options)
+                return ("yes_no", "relocate")
             if 'remote' in field_label:
-                return self._get_yes_no_value('remote' in self.preferred_work_location.lower(), options)
-                
+                return ("yes_no", "remote")
+
         # Handle common field types
-        if field_type == 'name':
-            return self.name
-        if field_type == 'email':
-            return self.email
-        if field_type == 'phone':
-            return self.phone
-        if field_type == 'linkedin':
-            return self.linkedin
-        if field_type == 'address':
-            return self.address
-        if field_type == 'salary':
-            return self.desired_salary
-        if field_type == 'experience':
-            return str(self.years_experience)
-            
+        if field_type in FIELD_TYPE_ATTRIBUTES:
+            return ("value", FIELD_TYPE_ATTRIBUTES[field_type])
+
         # Fallback to label-based matching for other fields
-        combined_text = f"{field_label} {field_name} {field_id}".lower()
-        
-        if any(term in combined_text for term in ["name", "full name", "fullname"]):
-            return self.name
-        if any(term in combined_text for term in ["email", "e-mail"]):
-            return self.email
-        if any(term in combined_text for term in ["phone", "telephone", "mobile", "cell"]):
-            return self.phone
-        if any(term in combined_text for term in ["linkedin", "linked-in", "linked in"]):
-            return self.linkedin
-        if any(term in combined_text for term in ["address", "location"]):
-            return self.address
-        if any(term in combined_text for term in ["website", "web site", "personal site"]):
-            return self.website
-        if any(term in combined_text for term in ["github", "git hub"]):
-            return self.github
-        if any(term in combined_text for term in ["portfolio"]):
-            return self.portfolio
-        if any(term in combined_text for term in ["summary", "about", "bio"]):
-            return self.summary
-        if any(term in combined_text for term in ["salary", "compensation", "pay"]):
-            return self.desired_salary
-        if any(term in combined_text for term in ["notice", "notice period"]):
-            return self.notice_period
-        if any(term in combined_text for term in ["start date", "available"]):
-            return self.available_start_date
-            
+        combined_text = f"{field_label} {field_name} {field_id}"
+        for terms, key in KEYWORD_ATTRIBUTES:
+            if any(term in combined_text for term in terms):
+                return ("value", key)
+
         return None  # No matching field found
-        
+
+    def get_value_for_field(self, field_info):
+        """Get the appropriate value for a form field based on its information."""
+        field_type = field_info.get('field_type', '')
+        field_label = field_info.get('label', '').lower() if field_info.get('label') else ""
+        field_name = field_info.get('name', '').lower() if field_info.get('name') else ""
+        field_id = field_info.get('id', '').lower() if field_info.get('id') else ""
+        options = field_info.get('options', [])
+
+        # A confident prediction from the field classifier wins over the rules
+        resolved = field_info.get('resolved') or self._resolve_key(field_type, field_label, field_name, field_id)
+        # Only build the record when debug logging is on; this runs for every field
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Resolved field", extra={"data": {
+                "field_type": field_type, "label": field_label, "name": field_name,
+                "id": field_id, "options": len(options or []), "resolved": resolved,
+            }})
+        return self.value_for(resolved, options)
+
     def _get_yes_no_value(self, boolean_value, options=None):
         """Helper method to get the appropriate Yes/No value based on the field's options."""
         if not options:
             return "Yes" if boolean_value else "No"
-            
+
         # Find the matching option based on the boolean value
+        accepted = YES_OPTIONS if boolean_value else NO_OPTIONS
         for option in options:
-            option_text = option["text"].lower()
-            if boolean_value and option_text in ["yes", "y", "true"]:
-                return option["value"]
-            if not boolean_value and option_text in ["no", "n", "false"]:
+            if option["text"].strip().lower() in accepted:
                 return option["value"]
-                
+
         # Fallback to default Yes/No if no matching option found
-        return "Yes" if boolean_value else "No" 
\ No newline at end of file
+        return "Yes" if boolean_value else "No"
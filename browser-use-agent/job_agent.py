@@ -1,12 +1,19 @@
 from langchain_openai import ChatOpenAI
 from browser_use import Agent
 from dotenv import load_dotenv
-from user_persona import user_persona
-from upload_resume import controller
+from user_persona import DEFAULT_PROFILE_PATH, load_persona
+from upload_resume import controller, resolve_resume_path
+import logging
 import os
 
 load_dotenv()
 
+logging.basicConfig(
+    level=os.getenv("AGENT_LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+logger = logging.getLogger(__name__)
+
 import asyncio
 
 llm = ChatOpenAI(model="gpt-4o")
@@ -31,48 +38,20 @@ def build_task(user_persona):
     )
 
 async def main():
-    # Debug: Check if resume file exists
-    print(f"DEBUG: Resume path from user_persona: {user_persona.resume_path}")
-    print(f"DEBUG: Current working directory: {os.getcwd()}")
-    
-    # Check if file exists
-    if os.path.exists(user_persona.resume_path):
-        print(f"DEBUG: ✅ Resume file EXISTS at: {user_persona.resume_path}")
-        print(f"DEBUG: File size: {os.path.getsize(user_persona.resume_path)} bytes")
-        print(f"DEBUG: File is readable: {os.access(user_persona.resume_path, os.R_OK)}")
+    user_persona = load_persona(os.getenv("AGENT_PROFILE", DEFAULT_PROFILE_PATH))
+
+    # upload_file uploads the resume from memory until the file changes
+    resume_path = resolve_resume_path(user_persona.resume_path)
+    if resume_path:
+        logger.debug("Resume file found at: %s", resume_path)
+        user_persona.resume_path = resume_path
     else:
-        print(f"DEBUG: ❌ Resume file DOES NOT EXIST at: {user_persona.resume_path}")
-        
-        # Try to find the file in the current directory
-        filename = os.path.basename(user_persona.resume_path)
-        current_dir_path = os.path.join(os.getcwd(), filename)
-        print(f"DEBUG: Checking if file exists in current directory: {current_dir_path}")
-        if os.path.exists(current_dir_path):
-            print(f"DEBUG: ✅ Found file in current directory: {current_dir_path}")
-            user_persona.resume_path = current_dir_path
-        else:
-            print(f"DEBUG: ❌ File not found in current directory either")
-            
-            # List files in current directory to help debug
-            print(f"DEBUG: Files in current directory:")
-            try:
-                for file in os.listdir(os.getcwd()):
-                    if file.lower().endswith('.pdf'):
-                        print(f"  - {file}")
-            except Exception as e:
-                print(f"DEBUG: Error listing directory: {e}")
+        logger.warning("Resume file does not exist at: %s", user_persona.resume_path)
 
     task = build_task(user_persona)
 
     available_file_paths = [user_persona.resume_path]
-    print(f"DEBUG: Available file paths for agent: {available_file_paths}")
-    
-    # Debug: Check if upload controller is properly configured
-    print(f"DEBUG: Upload controller type: {type(controller)}")
-    print(f"DEBUG: Upload controller has upload_file function: {hasattr(controller, 'upload_file')}")
-    
-    # Debug: Check if the resume path is in available_file_paths
-    print(f"DEBUG: Resume path in available_file_paths: {user_persona.resume_path in available_file_paths}")
+    logger.debug("Available file paths for agent: %s", available_file_paths)
 
     agent = Agent(
         task=task,
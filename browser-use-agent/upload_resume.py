@@ -2,11 +2,32 @@ import os
 import logging
 from browser_use.controller.service import Controller, ActionResult
 from user_persona import UserPersona
+# Importing user_persona puts the Playwright agent on sys.path
+from resume_assets import ResumeManager
 from browser_use.browser import BrowserSession
 
 logger = logging.getLogger(__name__)
 controller = Controller()
 
+# Validated resumes, kept in memory until the file on disk changes
+RESUMES = ResumeManager()
+
+
+def resolve_resume_path(path: str):
+	"""Return a usable resume path (falling back to the CWD), or None."""
+	if os.path.isfile(path):
+		return path
+	current_dir_path = os.path.join(os.getcwd(), os.path.basename(path))
+	if os.path.isfile(current_dir_path):
+		return current_dir_path
+	return None
+
+
+def load_resume(path: str):
+	"""Return the resume as a set_input_files payload, or None if it is unusable."""
+	asset = RESUMES.get(path)
+	return asset.payload() if asset else None
+
 @controller.action(
 	'Upload file to interactive element with file path ',
 )
@@ -14,7 +35,8 @@ async def upload_file(index: int, path: str, browser_session: BrowserSession, av
 	if path not in available_file_paths:
 		return ActionResult(error=f'File path {path} is not available')
 
-	if not os.path.exists(path):
+	resolved_path = resolve_resume_path(path)
+	if resolved_path is None:
 		return ActionResult(error=f'File {path} does not exist')
 
 	file_upload_dom_el = await browser_session.find_file_upload_element_by_index(index)
@@ -31,8 +53,12 @@ async def upload_file(index: int, path: str, browser_session: BrowserSession, av
 		logger.info(msg)
 		return ActionResult(error=msg)
 
+	payload = load_resume(resolved_path)
+	if payload is None:
+		return ActionResult(error=f'File {path} is not a usable resume')
+
 	try:
-		await file_upload_el.set_input_files(path)
+		await file_upload_el.set_input_files(payload)
 		msg = f'Successfully uploaded file to index {index}'
 		logger.info(msg)
 		return ActionResult(extracted_content=msg, include_in_memory=True)
@@ -1,5 +1,19 @@
+import json
+import logging
+import os
+import sys
 from pydantic import BaseModel
 
+# The profile model and file are shared with the Playwright agent, so both
+# agents apply as the same candidate
+AGENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agent")
+DEFAULT_PROFILE_PATH = os.path.join(AGENT_DIR, "user_profile.json")
+sys.path.insert(0, AGENT_DIR)
+
+from user_profile import UserProfile
+
+logger = logging.getLogger(__name__)
+
 class UserPersona(BaseModel):
     name: str
     email: str
@@ -15,17 +29,22 @@ class UserPersona(BaseModel):
     years_experience: int
     # Add more fields as needed
 
-user_persona = UserPersona(
-    name="Jane Doe",
-    email="jane@example.com",
-    phone="123-456-7890",
-    linkedin="https://linkedin.com/in/janedoe",
-    resume_path="/Users/jessecheng/auto-apply-job-agent/browser-use-agent/Fake Resume.pdf",
-    website="https://jane.com",
-    github="https://github.com/janedoe",
-    portfolio="https://jane.com/portfolio",
-    summary="Jane is a software engineer with 10 years of experience in the industry.",
-    current_company="Google",
-    current_position="Software Engineer",
-    years_experience=10
-) 
\ No newline at end of file
+    @classmethod
+    def from_profile(cls, profile):
+        """Build a persona from an agent UserProfile (or its to_dict() output)."""
+        data = profile.to_dict() if hasattr(profile, "to_dict") else profile
+        return cls(**{field: data[field] for field in cls.model_fields if field in data})
+
+
+def load_persona(path=DEFAULT_PROFILE_PATH):
+    """
+    Load the persona from the shared profile JSON.
+
+    The file is validated by the Playwright agent's UserProfile, so both agents
+    see the same values and defaults. Raises if the file cannot be read or is
+    not a valid profile; the agent must not apply as anybody else.
+    """
+    with open(path) as f:
+        profile = UserProfile.from_dict(json.load(f))
+    logger.debug("Loaded profile %s", path)
+    return UserPersona.from_profile(profile)
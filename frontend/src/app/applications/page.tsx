@@ -4,9 +4,11 @@ import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Plus, Trash } from "lucide-react";
+import { JobMode, queueJobs, watchJob } from "@/lib/api";
 
 export default function ApplicationsPage() {
   const [urls, setUrls] = useState([{ url: "", title: "" }]);
+  const [progress, setProgress] = useState<Record<string, string[]>>({});
 
   const handleUrlChange = (idx: number, field: string, value: string) => {
     setUrls((prev) => {
@@ -20,6 +22,26 @@ export default function ApplicationsPage() {
   const removeUrl = (idx: number) =>
     setUrls((prev) => prev.filter((_, i) => i !== idx));
 
+  const runJobs = async (mode: JobMode) => {
+    const targets = urls.map((entry) => entry.url.trim()).filter(Boolean);
+    if (targets.length === 0) return;
+    try {
+      const jobs = await queueJobs(targets, mode);
+      for (const job of jobs) {
+        setProgress((prev) => ({ ...prev, [job.url]: [] }));
+        watchJob(job.job_id, (event, data) => {
+          const line =
+            event === "field"
+              ? `${data.field ?? data.label}: ${data.status ?? data.field_type}`
+              : `status: ${data.status}`;
+          setProgress((prev) => ({ ...prev, [job.url]: [...(prev[job.url] ?? []), line] }));
+        });
+      }
+    } catch (e) {
+      alert((e as Error).message);
+    }
+  };
+
   return (
     <div className="max-w-2xl mx-auto py-10">
       <Card>
@@ -59,10 +81,26 @@ export default function ApplicationsPage() {
             <Plus className="w-4 h-4 mr-2" /> Add Another URL
           </Button>
           <div className="grid grid-cols-1 md:grid-cols-3 gap-4 mt-6">
-            <Button variant="outline">Extract Fields Only</Button>
-            <Button variant="secondary">Fill Forms (No Submit)</Button>
-            <Button variant="default">Fill & Submit Forms</Button>
+            <Button variant="outline" onClick={() => runJobs("extract")}>
+              Extract Fields Only
+            </Button>
+            <Button variant="secondary" onClick={() => runJobs("fill")}>
+              Fill Forms (No Submit)
+            </Button>
+            <Button variant="default" onClick={() => runJobs("submit")}>
+              Fill & Submit Forms
+            </Button>
           </div>
+          {Object.entries(progress).map(([url, lines]) => (
+            <div key={url} className="mt-4 text-sm">
+              <p className="font-medium">{url}</p>
+              {lines.map((line, i) => (
+                <p key={i} className="text-muted-foreground">
+                  {line}
+                </p>
+              ))}
+            </div>
+          ))}
         </CardContent>
       </Card>
     </div>
@@ -4,6 +4,7 @@ import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Textarea } from "@/components/ui/textarea";
+import { saveProfile } from "@/lib/api";
 
 const initialProfile = {
   name: "",
@@ -25,9 +26,13 @@ export default function ProfilePage() {
     setProfile((prev) => ({ ...prev, [field]: value }));
   };
 
-  const handleSave = () => {
-    // TODO: Integrate with backend
-    alert("Profile saved (not yet integrated)");
+  const handleSave = async () => {
+    try {
+      await saveProfile(profile);
+      alert("Profile saved");
+    } catch (e) {
+      alert((e as Error).message);
+    }
   };
 
   return (
@@ -0,0 +1,51 @@
+const API_URL = process.env.NEXT_PUBLIC_AGENT_API_URL ?? "http://127.0.0.1:8000";
+
+export type JobMode = "extract" | "fill" | "submit";
+
+export type JobStatus = {
+  job_id: string;
+  url: string;
+  profile_id: string;
+  mode: JobMode;
+  status: string;
+  result?: Record<string, unknown> | null;
+};
+
+export async function saveProfile(profile: Record<string, string>) {
+  const res = await fetch(`${API_URL}/profiles`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(profile),
+  });
+  if (!res.ok) throw new Error(`Failed to save profile (${res.status})`);
+  const { profile_id } = await res.json();
+  localStorage.setItem("profileId", profile_id);
+  return profile_id as string;
+}
+
+export async function queueJobs(urls: string[], mode: JobMode) {
+  const profileId = localStorage.getItem("profileId");
+  if (!profileId) throw new Error("Save your profile first");
+  const res = await fetch(`${API_URL}/jobs`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ profile_id: profileId, urls, mode }),
+  });
+  if (!res.ok) throw new Error(`Failed to queue jobs (${res.status})`);
+  const { jobs } = await res.json();
+  return jobs as JobStatus[];
+}
+
+export function watchJob(jobId: string, onEvent: (event: string, data: Record<string, unknown>) => void) {
+  const source = new EventSource(`${API_URL}/jobs/${jobId}/events`);
+  for (const event of ["status", "field"]) {
+    source.addEventListener(event, (e) => {
+      const data = JSON.parse((e as MessageEvent).data);
+      onEvent(event, data);
+      if (event === "status" && ["completed", "failed"].includes(String(data.status))) {
+        source.close();
+      }
+    });
+  }
+  return () => source.close();
+}